@@ -6,11 +6,13 @@ from pathlib import Path
 from tqdm import tqdm
 
 from lm_benchmark import settings
+from lm_benchmark.storage import TABLE_SUFFIXES
+from lm_benchmark.utils import str2bool
 
 from .analysis.score_util import MonthCounter
 
 
-def arguments() -> argparse.Namespace:
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
     """Build & Parse command-line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -24,29 +26,34 @@ def arguments() -> argparse.Namespace:
     parser.add_argument("--set", default="machine")
     parser.add_argument(
         "--header_lst",
+        nargs="+",
         default=["unprompted_0.3", "unprompted_0.6", "unprompted_1.0", "unprompted_1.5"],
     )
-    parser.add_argument("--count", default=False)
-    return parser.parse_args()
+    parser.add_argument("--count", type=str2bool, default=False)
+    parser.add_argument(
+        "--table_format", choices=list(TABLE_SUFFIXES), default="csv", help="Format of the CDI & count files"
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """Run the GoldReference loader and write results to a file."""
-    args = arguments()
+    args = arguments(argv)
     model = args.gen_file.split("/")[-1][:-4].split("_")[1]
     gen_file = Path(args.gen_file)
     est_file = Path(args.est_file)
     lang = args.lang
     header_lst = args.header_lst
-    test_file = Path(args.CDI_path) / f"{lang}_exp_{args.set}.csv"
+    suffix = TABLE_SUFFIXES[args.table_format]
+    test_file = Path(args.CDI_path) / f"{lang}_exp_{args.set}{suffix}"
     month_lst = [6, 36]
     count = args.count
 
     for header in tqdm(header_lst):
         score_dir = Path(f"{args.freq_path}/{args.prompt_type}/{model}")
-        count_all_file = Path(score_dir) / f"{header}.csv"
+        count_all_file = Path(score_dir) / f"{header}{suffix}"
         count_test_dir = Path(score_dir) / lang
-        count_test_file = Path(score_dir) / lang / f"{header}.csv"
+        count_test_file = Path(score_dir) / lang / f"{header}{suffix}"
         score_dir.mkdir(parents=True, exist_ok=True)
         count_test_dir.mkdir(parents=True, exist_ok=True)
 
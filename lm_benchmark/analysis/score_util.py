@@ -4,6 +4,8 @@ from pathlib import Path
 import pandas as pd
 
 from lm_benchmark import nlp_tools
+from lm_benchmark.chunking import Chunker
+from lm_benchmark.storage import iter_table_chunks, read_table, write_table
 
 ################################################################################################
 # functions to load crf generations
@@ -60,19 +62,8 @@ def segment_df(df: pd.DataFrame, column: str, target_sum: float) -> tuple[pd.Dat
         the first part will be empty.
 
     """
-    current_sum = 0.0
-    split_index = 0
-
-    for idx, value in enumerate(df[column]):
-        current_sum += value
-        if current_sum >= target_sum:
-            split_index = idx + 1  # Include the current row in the first segment
-            break
-
-        if current_sum > target_sum:
-            # If the current_sum exceeds target_sum, exact match is not possible
-            print(f"Exact match for target_sum {target_sum} is not possible.")
-            return pd.DataFrame(), df
+    # Include the row reaching the target in the first segment (0 rows if the target is never reached)
+    split_index = Chunker(df[column].to_numpy()).reach(target_sum)
 
     df1 = df.iloc[:split_index].reset_index(drop=True)
     df2 = df.iloc[split_index:].reset_index(drop=True)
@@ -154,8 +145,8 @@ def accum_count(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def load_csv(file_path: Path, start_column: str) -> pd.DataFrame:
-    """Read the CSV file starting from the given column header."""
-    data = pd.read_csv(file_path)
+    """Read the table (CSV/Parquet/Feather) starting from the given column header."""
+    data = read_table(file_path)
     # Get the index of the start column
     start_column_index = data.columns.get_loc(start_column)
     # Extract the columns starting from the specified column
@@ -214,19 +205,22 @@ class MonthCounter:
         self.load()
 
     def load(self) -> pd.DataFrame:
-        """Load the dataset into dataframes."""
-        generation_df = pd.read_csv(self._generation_csv_location)
-        generation_df.dropna()
-        generation_df["month"] = generation_df["month"].astype(int)
-        generation_df = generation_df.sort_values("month")
-        # select the given month range
-        self._generation_df = generation_df[
-            (generation_df["month"] >= self._month_range[0]) & (generation_df["month"] <= self._month_range[1])
-        ]
-        self._estimation_df = pd.read_csv(self._estimation_csv_location)
+        """Load the dataset into dataframes.
+
+        Only the columns used for counting are read from the generation file,
+        rows outside of the month range are dropped chunk by chunk.
+        """
+        columns = ["month", "word", "freq_m"] if self._count else ["month", self._header]
+        chunks = []
+        for chunk in iter_table_chunks(self._generation_csv_location, columns):
+            chunk["month"] = chunk["month"].astype(int)
+            # select the given month range
+            chunks.append(chunk[(chunk["month"] >= self._month_range[0]) & (chunk["month"] <= self._month_range[1])])
+        self._generation_df = pd.concat(chunks).sort_values("month", kind="stable")
+        self._estimation_df = read_table(self._estimation_csv_location)
         self._test_df = load_csv(self._test_csv_location, "word")
 
-        return generation_df
+        return self._generation_df
 
     def adjusted_count_all(self) -> pd.DataFrame:
         """Match two freq frames."""
@@ -259,7 +253,7 @@ class MonthCounter:
 
         # get cumulative frequency
         self._merged_df = accum_count(self._merged_df)
-        self._merged_df.to_csv(self._all_csv_location)
+        write_table(self._merged_df, self._all_csv_location, index=True)
         return self._merged_df
 
     def get_count(self) -> None:
@@ -268,4 +262,4 @@ class MonthCounter:
             self._merged_df = self.adjusted_count_all()
         # filter the test set
         self._selected_rows = self._merged_df[self._merged_df["word"].isin(self._test_df["word"])]
-        self._selected_rows.to_csv(self._count_filtered_location)
+        write_table(self._selected_rows, self._count_filtered_location, index=True)
@@ -1,9 +1,22 @@
 import argparse
 import dataclasses
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import pandas as pd
+from tqdm import tqdm
+
 from lm_benchmark import settings
 from lm_benchmark.datasets.human_cdi import GoldReferenceCSV, POSTypes
+from lm_benchmark.datasets.human_cdi.gold_reference import clean_definitions
+from lm_benchmark.datasets.utils import POSCache, words_to_pos
+from lm_benchmark.storage import TABLE_SUFFIXES, write_table
+from lm_benchmark.utils import file_digest
+
+# Manifest of the gold files built by `build_all` (stored in the target directory)
+MANIFEST_FILE = "manifest.json"
 
 
 @dataclasses.dataclass
@@ -11,7 +24,120 @@ class BuildHumanCDI:
     filter_by_word_type: POSTypes = POSTypes.content
 
 
-def arguments() -> argparse.Namespace:
+@dataclasses.dataclass(frozen=True)
+class GoldJob:
+    """Build of the gold file of one language & CDI form."""
+
+    lang: str
+    test_type: str
+    src: Path
+    target: Path
+    pos_filter_type: POSTypes = POSTypes.content
+
+    @property
+    def name(self) -> str:
+        """Name of the job (used as key in the manifest)."""
+        return f"{self.lang}_{self.test_type}"
+
+    def manifest_entry(self) -> dict:
+        """Inputs of the job as recorded in the manifest."""
+        age_min, age_max = settings.AGE_DICT[self.lang]
+        return {
+            "src": self.src.name,
+            "src_sha256": file_digest(self.src),
+            "target": self.target.name,
+            "age_min": age_min,
+            "age_max": age_max,
+            "pos_filter_type": str(self.pos_filter_type),
+        }
+
+
+def build_gold_file(job: GoldJob, pos_cache: POSCache) -> str:
+    """Build & write the gold file of a job."""
+    age_min, age_max = settings.AGE_DICT[job.lang]
+    gd_loader = GoldReferenceCSV(
+        raw_csv=job.src,
+        age_min=age_min,
+        age_max=age_max,
+        pos_filter_type=job.pos_filter_type,
+        pos_cache=pos_cache,
+    )
+    write_table(gd_loader.gold, job.target)
+    return job.name
+
+
+def build_all(
+    src_dir: Path,
+    target_dir: Path,
+    pos_filter_type: POSTypes = POSTypes.content,
+    n_jobs: int | None = None,
+    n_process: int = 1,
+    table_format: str = "csv",
+    *,
+    force: bool = False,
+) -> list[str]:
+    """Build the gold files of all languages (settings.AGE_DICT) & CDI forms (settings.CDI_TEST_TYPES).
+
+    A manifest records the hash of the raw CSV & the parameters of each gold file,
+    files whose inputs did not change are skipped (unless force is set).
+    The words of all forms are PoS tagged at once in the main process,
+    workers then only read the shared tags.
+
+    Returns
+    -------
+        the names of the gold files that were built
+
+    """
+    target_dir.mkdir(exist_ok=True, parents=True)
+    manifest_file = target_dir / MANIFEST_FILE
+    manifest = json.loads(manifest_file.read_text()) if manifest_file.is_file() else {}
+
+    jobs, entries = [], {}
+    for lang in settings.AGE_DICT:
+        for test_type in settings.CDI_TEST_TYPES:
+            job = GoldJob(
+                lang=lang,
+                test_type=test_type,
+                src=src_dir / f"{lang}_{test_type}.csv",
+                target=target_dir / f"{lang}_{test_type}_human{TABLE_SUFFIXES[table_format]}",
+                pos_filter_type=pos_filter_type,
+            )
+            if not job.src.is_file():
+                print(f"{job.name}: no raw file {job.src}, skipping")
+                continue
+
+            entry = job.manifest_entry()
+            if not force and job.target.is_file() and manifest.get(job.name) == entry:
+                print(f"{job.name}: up to date")
+                continue
+            jobs.append(job)
+            entries[job.name] = entry
+
+    if not jobs:
+        return []
+
+    # Tag all words in one pass, so that spaCy is only loaded here
+    pos_cache = POSCache()
+    words = {
+        word for job in jobs for word in clean_definitions(pd.read_csv(job.src, usecols=["item_definition"]))["word"]
+    }
+    words_to_pos(sorted(words), n_process=n_process, cache=pos_cache)
+
+    built = []
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(build_gold_file, job, pos_cache) for job in jobs]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Building gold files", unit="file"):
+            name = future.result()
+            built.append(name)
+            # Update the manifest as files complete, so that an interrupted run keeps its progress
+            manifest[name] = entries[name]
+            tmp_file = manifest_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+            tmp_file.replace(manifest_file)
+    return sorted(built)
+
+
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
     """Build & Parse command-line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -24,16 +150,36 @@ def arguments() -> argparse.Namespace:
     parser.add_argument("--lang", type=str, default="AE")
     parser.add_argument("--test_type", type=str, default="exp")
     parser.add_argument("--src_file", type=str, default=f"{settings.PATH.DATA_DIR}/datasets/raw/")
+    parser.add_argument("--n_process", type=int, default=1, help="Number of processes used for PoS tagging")
     parser.add_argument("--target_file", type=str, default=f"{settings.PATH.DATA_DIR}/datasets/processed/CDI/")
-    return parser.parse_args()
+    parser.add_argument(
+        "--all", action="store_true", help="Build all languages & test types (ignores --lang & --test_type)"
+    )
+    parser.add_argument("--n_jobs", type=int, default=None, help="Number of workers used with --all")
+    parser.add_argument("--force", action="store_true", help="With --all, rebuild files even if inputs are unchanged")
+    parser.add_argument("--table_format", choices=list(TABLE_SUFFIXES), default="csv", help="Format of the gold files")
+    return parser.parse_args(argv)
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """Run the GoldReference loader and write results to a file."""
-    args = arguments()
+    args = arguments(argv)
+
+    if args.all:
+        built = build_all(
+            Path(args.src_file),
+            Path(args.target_file),
+            pos_filter_type=POSTypes(args.filter_by_word_type),
+            n_jobs=args.n_jobs,
+            n_process=args.n_process,
+            table_format=args.table_format,
+            force=args.force,
+        )
+        print(f"Finished preprocessing! built: {', '.join(built) or 'nothing'}")
+        return
 
     src = Path(args.src_file).joinpath(args.lang + "_" + args.test_type + ".csv")
-    target = Path(args.target_file).joinpath(args.lang + "_" + args.test_type + "_human.csv")
+    target = Path(args.target_file).joinpath(f"{args.lang}_{args.test_type}_human{TABLE_SUFFIXES[args.table_format]}")
     print(f"{args.lang} {args.test_type} loaded")
     age_min = settings.AGE_DICT[args.lang][0]
     age_max = settings.AGE_DICT[args.lang][1]
@@ -43,8 +189,9 @@ def main() -> None:
         age_min=age_min,
         age_max=age_max,
         pos_filter_type=POSTypes(args.filter_by_word_type),
+        n_process=args.n_process,
     )
-    gd_loader.gold.to_csv(target, index=False)
+    write_table(gd_loader.gold, target)
     print("Finished preprocessing!")
 
 
@@ -2,18 +2,18 @@
 
 import argparse
 
-import pandas as pd
-
 from lm_benchmark import settings
 from lm_benchmark.model import model_util
+from lm_benchmark.storage import read_table, write_table
+from lm_benchmark.utils import str2bool
 
 
-def arguments() -> argparse.Namespace:
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
     """Build & Parse command-line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--src_file", default=f"{settings.PATH.DATA_DIR}/datasets/processed/freq/800h.csv")
     parser.add_argument("--target_file", default=f"{settings.PATH.DATA_DIR}/datasets/processed/generation/800h.csv")
-    parser.add_argument("--fixed_alpha", default=True)
+    parser.add_argument("--fixed_alpha", type=str2bool, default=True)
     parser.add_argument("--alpha", type=int, default=80000, help="?")
     parser.add_argument(
         "--desired_oov",
@@ -21,7 +21,7 @@ def arguments() -> argparse.Namespace:
         default=0.023,
         help="Desired OOV rate as a fraction (e.g., 0.05 for 5%).",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def calculate_alpha(total_token_count: int, desired_oov: float) -> float:
@@ -43,10 +43,10 @@ def calculate_alpha(total_token_count: int, desired_oov: float) -> float:
     return desired_oov * total_token_count
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """Main Function Allowing calling from CMD."""
-    args = arguments()
-    ref_count = pd.read_csv(args.src_file).dropna()
+    args = arguments(argv)
+    ref_count = read_table(args.src_file).dropna()
     if args.fixed_alpha:
         alpha = args.alpha
         print("Using fixed alpha parameter")
@@ -55,7 +55,7 @@ def main() -> None:
         print("Adjusting alpha to reach the desired oov rate")
 
     gen_count = model_util.make_crp(ref_count, alpha)
-    gen_count.to_csv(args.target_file, index=False)
+    write_table(gen_count, args.target_file)
 
 
 if __name__ == "__main__":
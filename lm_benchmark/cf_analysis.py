@@ -6,11 +6,13 @@ from pathlib import Path
 import pandas as pd
 
 from lm_benchmark import nlp_tools, settings
+from lm_benchmark.storage import write_table
+from lm_benchmark.utils import str2bool
 
 from .datasets.machine_cdi import probe_util
 
 
-def arguments() -> argparse.Namespace:
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
     """Build & Parse command-line arguments."""
     parser = argparse.ArgumentParser(description="Select probe set that is unique to the target dir")
     parser.add_argument(
@@ -34,9 +36,9 @@ def arguments() -> argparse.Namespace:
         default=f"{settings.PATH.DATA_DIR / 'datasets/processed/generation/100' }",
         help="generation dir",
     )
-    parser.add_argument("--prop_lst", type=list, default=[0.5, 1], help="prop of reserved words")
-    parser.add_argument("--run_stat", default=False, help="whether to perform stat")
-    return parser.parse_args()
+    parser.add_argument("--prop_lst", nargs="+", type=float, default=[0.5, 1], help="prop of reserved words")
+    parser.add_argument("--run_stat", type=str2bool, default=False, help="whether to perform stat")
+    return parser.parse_args(argv)
 
 
 def analyze_pipeline(
@@ -66,9 +68,9 @@ def analyze_pipeline(
     return result, gen_files_all, probe_files_all
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """Main function to perform CF analysis via CMD."""
-    args = arguments()
+    args = arguments(argv)
     input_dir = Path(args.input_dir)
     output_dir = Path(args.output_dir)
     cdi_dir = Path(args.CDI_dir)
@@ -109,5 +111,5 @@ def main() -> None:
                     result["prop"] = prop
                     result_all = pd.concat([result_all, result])
 
-    result_all.to_csv(output_dir)
+    write_table(result_all, output_dir, index=True)
     print("Finished stat analysis")
@@ -0,0 +1,100 @@
+"""Split rows into chunks by a budget over a column (ex: number of tokens of each utterance).
+
+The cumulative sum of the column is computed once, chunk boundaries are found by binary search
+(`np.searchsorted`), so cutting K chunks from n rows costs O(n + K log n) instead of re-summing
+the remaining rows for every chunk.
+
+Sizes are expected to be non-negative (the cumulative sum must be sorted).
+"""
+
+import math
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+
+class Chunker:
+    """Budgeted chunks of a sequence of row sizes.
+
+    With `repeat`, rows are seen as repeated endlessly (row n is row 0 again, ...): positions past the end
+    wrap around, and rows are only gathered when taken, the repeated rows are never built.
+    """
+
+    def __init__(self, sizes: t.Iterable[float] | np.ndarray | pd.Series, *, repeat: bool = False) -> None:
+        self.cum = np.cumsum(np.asarray(sizes))
+        self.repeat = repeat
+
+    @classmethod
+    def from_cumsum(cls, cum: np.ndarray, *, repeat: bool = False) -> "Chunker":
+        """Build from an existing cumulative sum (ex: `TokenCorpus.cum_tokens`), no copy is made."""
+        chunker = cls.__new__(cls)
+        chunker.cum = cum
+        chunker.repeat = repeat
+        return chunker
+
+    def __len__(self) -> int:
+        """Number of rows (of one repetition)."""
+        return len(self.cum)
+
+    @property
+    def total(self) -> float:
+        """Sum of all sizes (of one repetition)."""
+        return self.cum[-1].item() if len(self.cum) else 0
+
+    def _search(self, value: float, side: t.Literal["left", "right"]) -> int:
+        """Position of value in the cumulative sum (as `np.searchsorted`), wrapping around if repeated."""
+        n, total = len(self), self.total
+        if not self.repeat or total <= 0:
+            return int(np.searchsorted(self.cum, value, side=side))
+        # Number of full repetitions before the position
+        reps = max(math.ceil(value / total) - 1 if side == "left" else math.floor(value / total), 0)
+        return reps * n + int(np.searchsorted(self.cum, value - reps * total, side=side))
+
+    def sum_before(self, position: int) -> float:
+        """Sum of the sizes of rows [0, position)."""
+        if position <= 0:
+            return 0
+        reps, rest = divmod(position, len(self)) if self.repeat else (0, min(position, len(self)))
+        return reps * self.total + (self.cum[rest - 1].item() if rest else 0)
+
+    def cut(self, budget: float) -> int:
+        """Number of rows before the first one whose cumulative sum reaches the budget (all rows if none)."""
+        return self._search(budget, "left")
+
+    def reach(self, budget: float) -> int:
+        """Number of rows up to (included) the first one whose cumulative sum reaches the budget (0 if none)."""
+        position = self._search(budget, "left")
+        return position + 1 if self.repeat or position < len(self) else 0
+
+    def fit(self, budget: float, start: int = 0) -> int:
+        """End of the largest chunk starting at start whose sum is below or equal to the budget."""
+        return max(self._search(self.sum_before(start) + budget, "right"), start)
+
+    def chunks(self, budget: float, n_chunks: int | None = None, start: int = 0) -> list[tuple[int, int]]:
+        """Consecutive chunks (start, stop) of rows whose sum is below or equal to the budget.
+
+        Without `n_chunks`, rows are chunked until the end (rows larger than the budget stop the chunking).
+
+        Raises
+        ------
+            ValueError if the number of chunks is not given for repeated rows
+
+        """
+        if n_chunks is None and self.repeat:
+            raise ValueError("Number of chunks must be given for repeated rows !!")
+
+        result = []
+        while n_chunks is None or len(result) < n_chunks:
+            stop = self.fit(budget, start)
+            if n_chunks is None and (stop == start or start >= len(self)):
+                break
+            result.append((start, stop))
+            start = stop
+        return result
+
+    def take(self, df: pd.DataFrame, start: int, stop: int) -> pd.DataFrame:
+        """Rows [start, stop) of a frame (wrapping around if repeated)."""
+        if stop <= len(df) or not self.repeat:
+            return df.iloc[start:stop]
+        return df.iloc[np.arange(start, stop) % len(df)]
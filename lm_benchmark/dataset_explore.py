@@ -5,6 +5,7 @@ from pathlib import Path
 import pandas as pd
 
 from lm_benchmark import nlp_tools, plot_util, settings
+from lm_benchmark.chunking import Chunker
 
 # set constant setting
 FREQ_ROOT = f"{settings.PATH.DATA_DIR / 'datasets/processed/month_count'}"
@@ -27,10 +28,8 @@ def select_rows(candi: pd.DataFrame, target: float) -> tuple[pd.DataFrame, pd.Da
 
     Return the rest of the dataset and the selected rows.
     """
-    cumulative_sum = candi["num_tokens"].cumsum()
-    selected_rows = candi[cumulative_sum <= target]
-    rest_df = candi[cumulative_sum > target]
-    return selected_rows, rest_df
+    stop = Chunker(candi["num_tokens"].to_numpy()).fit(target)
+    return candi.iloc[:stop], candi.iloc[stop:]
 
 
 def chunk_dataframe(df, column_name, trans_header, m, n, out_path):
@@ -40,16 +39,14 @@ def chunk_dataframe(df, column_name, trans_header, m, n, out_path):
     tc_lst = []
     sub_dataframes = []
 
-    chunk_number = 1
-
-    while chunk_number <= n:
-        # select rows based on the target sum
-        current_chunk_df, df = select_rows(df, m)
+    # select rows based on the target sum (boundaries of all chunks from a single cumulative sum)
+    chunker = Chunker(df["num_tokens"].to_numpy())
+    for chunk_number, (start, stop) in enumerate(chunker.chunks(m, n), start=1):
+        current_chunk_df = df.iloc[start:stop]
         count_df = nlp_tools.TokenCount.from_df(current_chunk_df, trans_header)
         tc_lst.append(count_df)
         # Save to CSV
         current_chunk_df.to_csv(Path(out_path) / f"{chunk_number}.csv", index=False)
-        chunk_number += 1
 
     # Get the summary statistics
     child_stats = plot_util.tc_summary(tc_lst[:n])
@@ -1,3 +1,4 @@
+from .catalog import TranscriptCatalog
 from .gold_reference import GoldReferenceCSV, POSTypes
 
-__all__ = ["GoldReferenceCSV", "POSTypes"]
+__all__ = ["GoldReferenceCSV", "POSTypes", "TranscriptCatalog"]
@@ -0,0 +1,162 @@
+"""Age-indexed catalog of the CHILDES transcriptions."""
+
+import contextlib
+import sqlite3
+import typing as t
+from pathlib import Path
+
+import pandas as pd
+from tqdm import tqdm
+
+from lm_benchmark import settings
+from lm_benchmark.datasets import utils
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    corpus TEXT NOT NULL,
+    child_months INTEGER,
+    speakers TEXT NOT NULL,
+    num_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS transcripts_months ON transcripts (child_months);
+"""
+
+
+class TranscriptCatalog:
+    """Index of CHA files: path -> (child age in months, language, corpus, speakers, number of tokens).
+
+    The catalog is an SQLite file built by reading only the headers of the CHA files (up to the first utterance).
+    Paths are stored relative to the transcript directory (organised as lang/corpus/.../file.cha).
+    Lookups share one connection, opened on first use & kept until `close` (or the end of a `with` block).
+    """
+
+    def __init__(self, db_file: Path | None = None, transcript_dir: Path | None = None) -> None:
+        self.db_file = settings.PATH.childes_catalog_path if db_file is None else db_file
+        self.transcript_dir = settings.PATH.transcript_path if transcript_dir is None else transcript_dir
+        self.db_file.parent.mkdir(exist_ok=True, parents=True)
+        self._reader: sqlite3.Connection | None = None
+        with self.connect() as con:
+            con.executescript(SCHEMA)
+
+    def __enter__(self) -> t.Self:
+        """Use the catalog in a `with` block (the lookup connection is closed at the end)."""
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Close the lookup connection."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the lookup connection."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    @contextlib.contextmanager
+    def connect(self) -> t.Iterator[sqlite3.Connection]:
+        """Open a connection to the catalog (changes are committed on exit)."""
+        con = sqlite3.connect(self.db_file)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def key(self, file: Path) -> str:
+        """Catalog key of a CHA file.
+
+        Raises
+        ------
+            ValueError if the file is not in the transcript directory
+
+        """
+        return file.relative_to(self.transcript_dir).as_posix()
+
+    def scan(self, file: Path, cache: utils.CHACache | None = None, *, count_tokens: bool = False) -> tuple:
+        """Build the catalog row of a CHA file."""
+        stat = file.stat()
+        parts = file.relative_to(self.transcript_dir).parts
+        header = utils.read_header(file)
+        child = header.child
+
+        num_tokens = None
+        if cache is not None:
+            num_tokens = sum(len(words) for words in cache.words(file))
+        elif count_tokens:
+            num_tokens = sum(sum(counts.values()) for counts in utils.count_words_from_cha(file))
+
+        return (
+            self.key(file),
+            stat.st_mtime_ns,
+            stat.st_size,
+            parts[0] if len(parts) > 2 else "",
+            parts[1] if len(parts) > 2 else "",
+            None if child is None else child.months,
+            ",".join(header.participants),
+            num_tokens,
+        )
+
+    def build(self, cache: utils.CHACache | None = None, *, count_tokens: bool = False) -> int:
+        """Update the catalog with the current state of the transcript directory.
+
+        Only new or modified files (mtime/size) are scanned, deleted files are removed from the catalog.
+        Token counts are taken from the CHA cache if given, or computed when `count_tokens` is set.
+
+        Returns
+        -------
+            the number of files scanned
+
+        """
+        with self.connect() as con:
+            rows = con.execute("SELECT path, mtime_ns, size FROM transcripts").fetchall()
+        known = {path: (mtime, size) for path, mtime, size in rows}
+
+        rows, seen = [], set()
+        for file in tqdm(sorted(self.transcript_dir.rglob("*.cha")), desc="Scanning headers", unit="file"):
+            key = self.key(file)
+            seen.add(key)
+            stat = file.stat()
+            if known.get(key) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            rows.append(self.scan(file, cache, count_tokens=count_tokens))
+
+        with self.connect() as con:
+            con.executemany("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            con.executemany("DELETE FROM transcripts WHERE path = ?", [(k,) for k in known.keys() - seen])
+        return len(rows)
+
+    def month(self, file: Path) -> int | None:
+        """Age of the child (in months) of a CHA file, None if unknown.
+
+        Raises
+        ------
+            KeyError if the file is not in the catalog (not scanned yet)
+            ValueError if the file is not in the transcript directory
+
+        """
+        key = self.key(file)
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.db_file)
+        row = self._reader.execute("SELECT child_months FROM transcripts WHERE path = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def select(self, min_month: int, max_month: int, language: str | None = None) -> list[Path]:
+        """Select CHA files whose child age (in months) is in [min_month, max_month]."""
+        query = (
+            "SELECT path FROM transcripts WHERE child_months BETWEEN ? AND ? AND (? IS NULL OR language = ?) "
+            "ORDER BY path"
+        )
+        with self.connect() as con:
+            rows = con.execute(query, (min_month, max_month, language, language)).fetchall()
+        return [self.transcript_dir / path for (path,) in rows]
+
+    def to_df(self) -> pd.DataFrame:
+        """Load the full catalog as a DataFrame."""
+        with self.connect() as con:
+            return pd.read_sql_query("SELECT * FROM transcripts ORDER BY path", con)
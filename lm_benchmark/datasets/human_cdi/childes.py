@@ -1,15 +1,38 @@
 import collections
 import typing as t
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from tqdm import tqdm
+
 from lm_benchmark.datasets import utils
 
 
+def count_words(
+    annotations: list[Path],
+    cache: utils.CHACache | None = None,
+) -> tuple[collections.Counter, collections.Counter]:
+    """Count (adult, child) words of a list of CHA files."""
+    adult_counts: collections.Counter = collections.Counter()
+    child_counts: collections.Counter = collections.Counter()
+
+    for annotation in annotations:
+        if cache is not None:
+            adult_words, child_words = cache.words(annotation)
+            adult_counts.update(adult_words)
+            child_counts.update(child_words)
+        else:
+            utils.count_words_from_cha(annotation, adult_counts, child_counts)
+
+    return adult_counts, child_counts
+
+
 class CHAList:
     """An object interfacing a subset of  CHA files."""
 
-    def __init__(self, annotations: list[Path]) -> None:
+    def __init__(self, annotations: list[Path], cache: utils.CHACache | None = None) -> None:
         self.annotations = annotations
+        self.cache = cache
         self.data: dict[str, utils.CHAData] = {}
         self._adult_word_list: list[str] | None = None
         self._child_word_list: list[str] | None = None
@@ -38,10 +61,22 @@ class CHAList:
             data[annotation.name] = utils.extract_from_cha(annotation)
         return data
 
+    def word_counts(self) -> tuple[collections.Counter, collections.Counter]:
+        """Count (adult, child) words, streaming files one by one without building word lists."""
+        return count_words(self.annotations, self.cache)
+
     def build_words_lists(self) -> tuple[list[str], list[str]]:
         """Extract words from CHA transcriptions."""
         child_words, adult_words = [], []
 
+        if self.cache is not None:
+            # Cached word streams, only new or modified files are parsed
+            for annotation in self.annotations:
+                adult, child = self.cache.words(annotation)
+                child_words.extend(child)
+                adult_words.extend(adult)
+            return adult_words, child_words
+
         for cha in self.transcription_data.values():
             child_words.extend(cha.child_tr.raw_words())
             adult_words.extend(cha.adult_tr.raw_words())
@@ -66,12 +101,15 @@ class CHILDES:
 
     - child, speaker, language, corpus, number_of_tokens, src_path, filename, content
     - Word Frequency table
+
+    If a cache is given, cleaned words of each CHA file are stored on disk & reused between runs.
     """
 
-    def __init__(self, root_dir: Path) -> None:
+    def __init__(self, root_dir: Path, cache: utils.CHACache | None = None) -> None:
         if not root_dir.is_dir():
             raise ValueError(f"Given directory :: {root_dir} does not exist !!")
         self.root_dir = root_dir
+        self.cache = cache
         self._parsed_transcriptions: dict[str, dict[str, CHAList]] | None = None
 
     @property
@@ -81,35 +119,119 @@ class CHILDES:
             self._parsed_transcriptions = self.mk_parsed_transcriptions()
         return self._parsed_transcriptions
 
+    @property
+    def transcript_dir(self) -> Path:
+        """Location of the transcriptions (organised by language & corpus)."""
+        return self.root_dir / "transcript"
+
     def language_code_items(self) -> t.Iterable[str]:
         """Iterable containing the list of language codes."""
-        yield from (lang.name for lang in (self.root_dir / "transcript").iterdir())
+        yield from (lang.name for lang in self.transcript_dir.iterdir() if lang.is_dir())
 
     def corpus_items(self) -> t.Iterable[tuple[str, str]]:
         """Iterable containing a tuple typed: (land_code, corpus_path)."""
         for lang in self.language_code_items():
-            yield from ((lang, corpus.name) for corpus in (self.root_dir / lang).iterdir())
+            yield from ((lang, corpus.name) for corpus in (self.transcript_dir / lang).iterdir() if corpus.is_dir())
 
-    def annotations_items(self) -> t.Iterable[str, str, list[Path]]:
+    def annotations_items(self) -> t.Iterable[tuple[str, str, list[Path]]]:
         """Iterate over annotation items."""
         for lang, corpus in self.corpus_items():
-            yield from ((lang, corpus, list((self.root_dir / lang / corpus).rglob("*.cha"))))
+            yield lang, corpus, sorted((self.transcript_dir / lang / corpus).rglob("*.cha"))
 
     def mk_parsed_transcriptions(self) -> dict[str, dict[str, CHAList]]:
         """Extract all transcriptions from the given CHILDES dataset."""
         data: collections.defaultdict[str, dict[str, CHAList]] = collections.defaultdict(dict)
         for lang, corpus, annotations in self.annotations_items():
-            data[lang][corpus] = CHAList(annotations)
+            data[lang][corpus] = CHAList(annotations, cache=self.cache)
         return dict(data)
 
-    def word_frequencies(self, lang: str) -> tuple[collections.Counter, collections.Counter]:
-        """Calculate word frequency total."""
-        adult_total, child_total = [], []
+    def iter_corpus_frequencies(
+        self,
+        langs: t.Iterable[str] | None = None,
+        n_jobs: int | None = None,
+        shard_size: int = 32,
+    ) -> t.Iterator[tuple[str, str, collections.Counter, collections.Counter]]:
+        """Count words of each corpus using a pool of processes.
+
+        CHA files are split into shards of `shard_size` files, each worker counts the words of a shard,
+        and the partial counts are merged by corpus. Progress is reported per language.
+
+        Yields
+        ------
+            (lang, corpus, adult_counts, child_counts) as soon as all the shards of a corpus are done.
+
+        """
+        selected_langs = None if langs is None else set(langs)
+        shards: list[tuple[str, str, list[Path]]] = []
+        for lang, corpora in self.parsed_transcriptions.items():
+            if selected_langs is not None and lang not in selected_langs:
+                continue
+            for corpus, cha_lst in corpora.items():
+                if len(cha_lst.annotations) == 0:
+                    yield lang, corpus, collections.Counter(), collections.Counter()
+                shards.extend(
+                    (lang, corpus, cha_lst.annotations[i : i + shard_size])
+                    for i in range(0, len(cha_lst.annotations), shard_size)
+                )
+
+        # Number of pending shards & partial counts by corpus
+        pending = collections.Counter((lang, corpus) for lang, corpus, _ in shards)
+        partial: dict[tuple[str, str], tuple[collections.Counter, collections.Counter]] = {
+            key: (collections.Counter(), collections.Counter()) for key in pending
+        }
+        # One progress bar by language
+        files_by_lang: collections.Counter = collections.Counter()
+        for lang, _, annotations in shards:
+            files_by_lang[lang] += len(annotations)
+        bars = {
+            lang: tqdm(total=nb_files, desc=lang, unit="file", position=i)
+            for i, (lang, nb_files) in enumerate(sorted(files_by_lang.items()))
+        }
+
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                futures = {
+                    pool.submit(count_words, annotations, self.cache): (lang, corpus, len(annotations))
+                    for lang, corpus, annotations in shards
+                }
+                for future in as_completed(futures):
+                    lang, corpus, nb_files = futures[future]
+                    adult_counts, child_counts = future.result()
+                    partial[(lang, corpus)][0].update(adult_counts)
+                    partial[(lang, corpus)][1].update(child_counts)
+                    bars[lang].set_postfix_str(corpus)
+                    bars[lang].update(nb_files)
+
+                    pending[(lang, corpus)] -= 1
+                    if pending[(lang, corpus)] == 0:
+                        yield lang, corpus, *partial.pop((lang, corpus))
+        finally:
+            for bar in bars.values():
+                bar.close()
+
+    def word_frequencies(
+        self,
+        lang: str,
+        n_jobs: int | None = None,
+    ) -> tuple[collections.Counter, collections.Counter]:
+        """Calculate word frequency total.
+
+        If `n_jobs` is given, extraction runs in parallel on `n_jobs` processes (see iter_corpus_frequencies).
+        """
+        adult_total: collections.Counter = collections.Counter()
+        child_total: collections.Counter = collections.Counter()
+
+        if n_jobs is not None:
+            for _, _, adult, child in self.iter_corpus_frequencies(langs=[lang], n_jobs=n_jobs):
+                adult_total.update(adult)
+                child_total.update(child)
+            return adult_total, child_total
+
         corpus_dict: dict[str, CHAList] = self.parsed_transcriptions.get(lang, {})
 
         for cha_lst in corpus_dict.values():
-            adult, child = cha_lst.words_list
-            adult_total.extend(adult)
-            child_total.extend(child)
+            adult, child = cha_lst.word_counts()
+            adult_total.update(adult)
+            child_total.update(child)
 
-        return collections.Counter(adult_total), collections.Counter(child_total)
+        return adult_total, child_total
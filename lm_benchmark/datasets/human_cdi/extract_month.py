@@ -1,10 +1,12 @@
 """update month info from the CHILDES transcripts."""
 
-import re
 import sys
 from pathlib import Path
 
 from lm_benchmark import settings
+from lm_benchmark.datasets.utils.cha.parser import age_in_months, read_header
+
+from .catalog import TranscriptCatalog
 
 
 def extract_subpath(full_path: Path, target_string: str) -> Path | None:
@@ -30,30 +32,36 @@ def convert_to_raw_path(file_path: Path) -> Path | None:
 
 def convert_month(string: str) -> int:
     """Convert a age string (ex: 2;06) into a number of months."""
-    # Regular expression pattern to match the age component (e.g., '2;06.')
-    match = re.search(r"(\d+);(\d+)\.", string)
-    if match:
-        # Extract the year and month parts
-        years = int(match.group(1))
-        months = int(match.group(2))
-        # Convert the age to total months
-        return (years * 12) + months
-    raise ValueError(f"Failed to parse '{string}' as an age in months")
-
-
-def extract_month(file_path: Path) -> int | str:
-    """Extract Month from transcription file."""
+    return age_in_months(string)
+
+
+def extract_month(file_path: Path, catalog: TranscriptCatalog | None = None) -> int | str:
+    """Extract Month from transcription file.
+
+    If a catalog is given the month is looked up in it, otherwise (or if the file is not in the catalog)
+    only the header of the file is read.
+    """
     transcription_file = convert_to_raw_path(file_path)
-    if transcription_file is None or not transcription_file.is_file():
+    if transcription_file is None:
+        return settings.PLACEHOLDER_MONTH
+
+    if catalog is not None:
+        try:
+            month = catalog.month(transcription_file)
+        except (KeyError, ValueError):
+            # Not catalogued (yet): fall back to the header
+            pass
+        else:
+            return settings.PLACEHOLDER_MONTH if month is None else month
+
+    if not transcription_file.is_file():
         return settings.PLACEHOLDER_MONTH
 
-    transcriptions = transcription_file.read_text().split()
-    for element in transcriptions:
-        if "CHI|" in element:
-            try:
-                return convert_month(element)
-            except ValueError as e:
-                print(e, file=sys.stderr)
-                break
+    child = read_header(transcription_file).child
+    if child is not None:
+        try:
+            return convert_month(child.age)
+        except ValueError as e:
+            print(e, file=sys.stderr)
     # Parsing or search failed return placeholder
     return settings.PLACEHOLDER_MONTH
@@ -9,6 +9,16 @@ from lm_benchmark import settings
 from lm_benchmark.datasets import utils
 
 
+def clean_definitions(df: pd.DataFrame) -> pd.DataFrame:
+    """Build the clean `word` column from the item definitions (one row per synonym, expressions removed)."""
+    # segment lines with synonyms
+    df = utils.segment_synonym(df, "item_definition")
+    # Create a clean version of item_definition
+    df["word"] = df["item_definition"].apply(utils.word_cleaning)
+    # remove expressions
+    return utils.remove_exp(df, "word")
+
+
 class POSTypes(str, enum.Enum):
     """Categories for Part of speech (PoS)."""
 
@@ -52,6 +62,8 @@ class GoldReferenceCSV:
         age_max: int,
         raw_csv: Path,
         pos_filter_type: POSTypes = POSTypes.content,
+        n_process: int = 1,
+        pos_cache: utils.POSCache | None = None,
     ) -> None:
         if not raw_csv.is_file():
             raise ValueError(f"Given file ::{raw_csv}:: does not exist !!")
@@ -60,6 +72,8 @@ class GoldReferenceCSV:
         self.pos_filter_type = pos_filter_type
         self.age_min = age_min
         self.age_max = age_max
+        self.n_process = n_process
+        self.pos_cache = utils.POSCache() if pos_cache is None else pos_cache
 
         # Zero init
         self.download_date = None
@@ -89,19 +103,13 @@ class GoldReferenceCSV:
 
     def build_gold(self) -> pd.DataFrame:
         """Build the gold dataframe from the given src."""
-        df = self.df.copy()
-
-        # segment lines with synonyms
-        df = utils.segment_synonym(df, "item_definition")
-        # Create a clean version of item_definition
-        df["word"] = df["item_definition"].apply(utils.word_cleaning)
-        # remove expressions
-        df = utils.remove_exp(df, "word")
+        df = clean_definitions(self.df.copy())
+
         # Calculate Word length
         df["word_length"] = df["word"].apply(len)
 
         # Build POS for the list of words
-        df["POS"] = df["word"].apply(utils.word_to_pos)
+        df["POS"] = utils.words_to_pos(df["word"], n_process=self.n_process, cache=self.pos_cache)
 
         # Filter words by PoS
         if self.pos_filter_type == POSTypes.content:
@@ -2,21 +2,45 @@
 
 import argparse
 import os
-import re
-import string
 import typing as t
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
-from scipy.optimize import linear_sum_assignment  # type: ignore[import-untyped]
 from tqdm import tqdm
 
 from lm_benchmark import settings
+from lm_benchmark.chunking import Chunker
+from lm_benchmark.storage import read_table
 
+from .matching import match_values
+from .text_cleaning import clean_lines, clean_series, count_tokens, file_token_stats
 
-def load_metadata(meta_data_path: Path, text_dir: Path) -> pd.DataFrame:
-    """Load metadata for a fine-grained match."""
+
+def metadata_cache_file(meta_data_path: Path) -> Path:
+    """Default cache of the token counts of a metadata file (ex: matched2.csv -> matched2.cache.csv)."""
+    return meta_data_path.with_name(f"{meta_data_path.stem}.cache.csv")
+
+
+def load_metadata(
+    meta_data_path: Path, text_dir: Path, cache_file: Path | None = None, n_jobs: int | None = None
+) -> pd.DataFrame:
+    """Load metadata for a fine-grained match.
+
+    The number of tokens & lines of each text are counted in a process pool and kept in a cache file
+    (default: `metadata_cache_file`) with the mtime of the text; texts not modified since are not counted again.
+    The cache is only rewritten when it is missing or stale (metadata modified since, texts added, removed or
+    modified), the metadata file itself is never written.
+
+    Raises
+    ------
+        ValueError if the cache file is the metadata file
+
+    """
+    if cache_file is None:
+        cache_file = metadata_cache_file(meta_data_path)
+    if cache_file.resolve() == meta_data_path.resolve():
+        raise ValueError(f"Cache file ::{cache_file}:: would overwrite the metadata !!")
     meta_data = pd.read_csv(meta_data_path)
 
     # Extract filenames
@@ -24,20 +48,39 @@ def load_metadata(meta_data_path: Path, text_dir: Path) -> pd.DataFrame:
 
     # All files in text_dir
     print(f"Counting token_num from {text_dir}")
-    all_filenames = {f.name for f in text_dir.iterdir()}
-    selected_data = meta_data[meta_data["filename"].isin(all_filenames)]
-
-    num_tokens = []
-    for filename in selected_data["filename"].tolist():
-        frame = txt2csv(text_dir / filename)
-        num_tokens.append(frame["num_tokens"].tolist()[0])
-    selected_data["num_tokens"] = num_tokens
-    selected_data.to_csv(meta_data_path)
+    mtimes = {f.name: f.stat().st_mtime_ns for f in text_dir.iterdir()}
+    selected_data = meta_data[meta_data["filename"].isin(mtimes)].copy()
+    selected_data["mtime_ns"] = selected_data["filename"].map(mtimes)
+
+    stats: dict[str, tuple[int, int]] = {}
+    stale = True
+    if cache_file.is_file():
+        cached = pd.read_csv(cache_file)
+        if {"num_lines", "mtime_ns"}.issubset(cached.columns):
+            up_to_date = cached[cached["filename"].map(mtimes) == cached["mtime_ns"]]
+            stats = {row.filename: (row.num_tokens, row.num_lines) for row in up_to_date.itertuples(index=False)}
+            stale = (
+                cache_file.stat().st_mtime_ns < meta_data_path.stat().st_mtime_ns
+                or len(up_to_date) != len(cached)
+                or set(cached["filename"]) != set(selected_data["filename"])
+            )
+
+    to_count = sorted(set(selected_data["filename"]) - set(stats))
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        counts = executor.map(file_token_stats, [text_dir / name for name in to_count], chunksize=16)
+        stats.update(zip(to_count, tqdm(counts, total=len(to_count), unit="file"), strict=True))
+
+    selected_data["num_tokens"] = selected_data["filename"].map(lambda name: stats[name][0])
+    selected_data["num_lines"] = selected_data["filename"].map(lambda name: stats[name][1])
+    if stale or to_count:
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        selected_data.to_csv(tmp_file, index=False)
+        tmp_file.replace(cache_file)
     return selected_data
 
 
 # TODO(@Jing): this clean-up has some logic issues & might remove too much content
-def clean_text(loaded: list[str]) -> list[str]:
+def clean_text(loaded: list[str], *, progress: bool = True) -> list[str]:
     """Remove digits and punct of a text string.
 
     Returns
@@ -45,24 +88,7 @@ def clean_text(loaded: list[str]) -> list[str]:
     a list of the cleaned strings
 
     """
-    # puctuation remover using translations
-    translator = str.maketrans("", "", string.punctuation + string.digits)
-    translator[ord("-")] = ord(" ")  # Replace hyphen with blank space
-
-    result = [line for line in loaded if line.strip()]
-    cleaned_text = []
-    for sent in tqdm(result):
-        # Filter out non-ASCII characters
-        clean_string = "".join(char for char in sent if ord(char) < 128)
-        # Filter punctuation using translator
-        clean_string = clean_string.translate(translator).lower()
-        # ISSUE: what does this remove ? spaces ? use str.strip for that redundant
-        clean_string = re.sub(r"\s+", " ", clean_string)
-        # Filter trailing spaces
-        clean_string = clean_string.strip()
-        # Append to final text
-        cleaned_text.append(clean_string)
-    return cleaned_text
+    return clean_lines([line for line in loaded if line.strip()], progress=progress)
 
 
 def count_token(text: str) -> int:
@@ -70,17 +96,15 @@ def count_token(text: str) -> int:
     return len(text.split())
 
 
-def txt2csv(txt_file: Path) -> pd.DataFrame:
+def txt2csv(txt_file: Path, *, progress: bool = True) -> pd.DataFrame:
     """Load a txt file into csv dataframe.
 
-    Columns: filename;train;num_token
+    Columns: filename;train;num_token (the column is cleaned at once, its throughput is printed with progress)
     """
     # read train filename
-    cleaned_lines = clean_text(txt_file.read_text(encoding="utf8").split())
-    frame = pd.DataFrame(cleaned_lines)
-    # assign column headers
-    frame = frame.rename(columns={0: "train"})
-    frame["num_tokens"] = frame["train"].apply(count_token)
+    frame = pd.DataFrame({"train": txt_file.read_text(encoding="utf8").split()})
+    frame["train"] = clean_series(frame["train"], verbose=progress)
+    frame["num_tokens"] = count_tokens(frame["train"])
     frame.insert(loc=0, column="filename", value=txt_file.name)
 
     return frame
@@ -98,19 +122,18 @@ def remove_sublist(main_list: t.Sequence[t.Hashable], sublist: t.Sequence[t.Hash
 
 def cut_df(df: pd.DataFrame, target_cum_sum: pd.DataFrame, header: str = "num_tokens") -> pd.DataFrame:
     """Cut df rows until it has reached the target value."""
-    # Calculate cumulative sum
-    cum_sum = df[header].cumsum()
-    # Find the index where the cumulative sum exceeds or equals the target value
-    index_to_cut = cum_sum[cum_sum >= target_cum_sum].index.min()
-    # If no index found, keep all rows
-    if pd.isna(index_to_cut):
-        index_to_cut = len(df)
+    # Find the row where the cumulative sum exceeds or equals the target value (all rows if none)
+    index_to_cut = Chunker(df[header].to_numpy()).cut(target_cum_sum)
     # Remove rows after the index_to_cut
     return df.iloc[:index_to_cut]
 
 
-def match_dataframes(dfa: pd.DataFrame, dfb: pd.DataFrame) -> pd.DataFrame:
-    """Match files based on genre."""
+def match_dataframes(dfa: pd.DataFrame, dfb: pd.DataFrame, *, exact: bool = True) -> pd.DataFrame:
+    """Match files based on genre.
+
+    Each file of dfa is matched to a distinct file of dfb of the same genre, minimizing the total difference of
+    their number of tokens (closest free file in order of size if not exact, faster but not optimal).
+    """
     matched_rows = []
     for genre in dfa["genre"].unique():
         dfa_genre = dfa[dfa["genre"] == genre]
@@ -119,8 +142,7 @@ def match_dataframes(dfa: pd.DataFrame, dfb: pd.DataFrame) -> pd.DataFrame:
         if len(dfb_genre) < len(dfa_genre):
             raise ValueError(f"Not enough rows in dfB to match genre '{genre}' in dfA")
 
-        cost_matrix = np.abs(dfa_genre["num_tokens"].to_numpy()[:, None] - dfb_genre["num_tokens"].to_numpy())
-        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+        col_ind = match_values(dfa_genre["num_tokens"].to_numpy(), dfb_genre["num_tokens"].to_numpy(), exact=exact)
         matched_rows.append(dfb_genre.iloc[col_ind])
 
     # Return concatenation of matched rows
@@ -133,6 +155,9 @@ def get_ind_mat(
     file: str,
     text_dir: Path,
     meta_data: pd.DataFrame,
+    *,
+    exact: bool = True,
+    n_jobs: int | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Construct the target pseudo dataset to estimate oov token freq."""
     # read train filename
@@ -147,42 +172,61 @@ def get_ind_mat(
     genre_target = meta_data[meta_data["filename"].isin(file_lst)]
 
     # count token numbers
-    matched_df = match_dataframes(genre_target, genre_candi)
+    matched_df = match_dataframes(genre_target, genre_candi, exact=exact)
 
     # get the total number of tokens
-    train_num = pd.read_csv(train_freq_dir / file)["num_tokens"].sum()
+    train_num = read_table(train_freq_dir / file, columns=["num_tokens"])["num_tokens"].sum()
 
-    # get constructed set
-    train_frames = [txt2csv(text_dir / file) for file in matched_df["filename"].tolist()]
-    train_frame = pd.concat([*train_frames])
+    # get constructed set (books are cleaned in parallel)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        book_files = [text_dir / name for name in matched_df["filename"].tolist()]
+        train_frames = list(tqdm(executor.map(_book_frame, book_files), total=len(book_files), unit="book"))
+    train_frame = pd.concat(train_frames, ignore_index=True)
 
     return train_frame, train_num
 
 
-def get_ood_mat(text_path: Path, train_freq_dir: Path, out_dir: Path) -> None:
-    """Construct the target pseudo dataset from CHIDLES transcript."""
+def _book_frame(txt_file: Path) -> pd.DataFrame:
+    return txt2csv(txt_file, progress=False)
+
+
+# CHILDES utterances shared by the workers writing OOD datasets (set once per worker)
+_ood_frame: pd.DataFrame
+_ood_chunker: Chunker
+
+
+def _init_ood_worker(frame: pd.DataFrame) -> None:
+    global _ood_frame, _ood_chunker  # noqa: PLW0603
+    _ood_frame = frame
+    # utterances are repeated as many times as needed to reach the size of each train set
+    _ood_chunker = Chunker(frame["num_tokens"].to_numpy(), repeat=True)
+
+
+def _write_ood_file(train_freq_file: Path, out_file: Path) -> None:
+    # count token numbers
+    train_num = read_table(train_freq_file, columns=["num_tokens"])["num_tokens"].sum()
+    # cut additional line to align with the target train set
+    train_frame = _ood_chunker.take(_ood_frame, 0, _ood_chunker.cut(train_num))
+    train_frame.to_csv(out_file)
+
+
+def get_ood_mat(text_path: Path, train_freq_dir: Path, out_dir: Path, n_jobs: int | None = None) -> None:
+    """Construct the target pseudo dataset from CHIDLES transcript.
+
+    The transcript is loaded once, the dataset of each train set is cut & written in a process pool.
+    """
     # get constructed set
     frame = pd.read_csv(text_path)
     frame = frame.dropna()
     frame = frame.sample(frac=1, random_state=66).reset_index(drop=True)
+    out_dir.mkdir(exist_ok=True, parents=True)
+
     # loop train_freq file
-    for file in tqdm(os.listdir(train_freq_dir)):
-        # count token numbers
-        train_num = pd.read_csv(train_freq_dir / file)["num_tokens"].sum()
-        oov_sum = 0
-        train_frame = pd.DataFrame()
-        n = 0
-        while oov_sum < train_num:
-            oov_sum += frame["num_tokens"].sum()
-            train_frame = pd.concat([train_frame, frame])
-            n += 1
-
-        # cut additional line to align with the target train set
-        train_frame = cut_df(train_frame, train_num, "num_tokens")
-        # print out the utt
-        if not out_dir.is_dir():
-            out_dir.mkdir(parents=True)
-        train_frame.to_csv(out_dir / file)
+    files = sorted(os.listdir(train_freq_dir))
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_ood_worker, initargs=(frame,)) as executor:
+        futures = [executor.submit(_write_ood_file, train_freq_dir / file, out_dir / file) for file in files]
+        for future in tqdm(as_completed(futures), total=len(futures), unit="file"):
+            future.result()
 
 
 def parse_args() -> argparse.Namespace:
@@ -194,6 +238,10 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("-m", "--mode", default="ood")
     # TODO(@Jing): What is this ?
     parser.add_argument("-f", "--file", default="400.csv")
+    parser.add_argument("--n_jobs", type=int, default=None, help="Number of worker processes")
+    parser.add_argument(
+        "--approx_match", action="store_true", help="Match books to the closest free one (faster, not optimal)"
+    )
 
     return parser.parse_args()
 
@@ -208,25 +256,26 @@ def main() -> None:
     if mode == "ind":
         meta_data_path = settings.PATH.transcript_path
         text_dir = settings.PATH.audiobook_txt_path
-        if not (meta_data_path / "matched.csv").is_file():
-            print("No metadata available, creating...")
-            meta_data = load_metadata(meta_data_path / "matched2.csv", text_dir)
-        else:
-            meta_data = pd.read_csv(meta_data_path / "matched.csv")
+        # token counts are cached next to the metadata (matched2.cache.csv), only new or modified texts are counted
+        meta_data = load_metadata(meta_data_path / "matched2.csv", text_dir, n_jobs=args.n_jobs)
         # "/Users/jliu/PycharmProjects/freq_bias_benchmark/data/train/filename/7100.csv"
         filename_path = Path(args.input_filename_path)
 
         file = args.file
-        train_frame, train_num = get_ind_mat(filename_path, train_freq_dir, file, text_dir, meta_data)
+        train_frame, train_num = get_ind_mat(
+            filename_path,
+            train_freq_dir,
+            file,
+            text_dir,
+            meta_data,
+            exact=not args.approx_match,
+            n_jobs=args.n_jobs,
+        )
 
         # print out the utt
-        if not out_dir.is_dir():
-            out_dir.mkdir(parents=True)
-
-        train_frame.to_csv(out_dir / file)
-        train_frame = pd.read_csv(out_dir / file)
+        out_dir.mkdir(exist_ok=True, parents=True)
         train_frame = cut_df(train_frame, train_num)
-        train_frame.to_csv(out_dir + file)
+        train_frame.to_csv(out_dir / file)
 
     else:
-        get_ood_mat(settings.PATH.childes_adult_csv_path, train_freq_dir, out_dir)
+        get_ood_mat(settings.PATH.childes_adult_csv_path, train_freq_dir, out_dir, n_jobs=args.n_jobs)
@@ -0,0 +1,155 @@
+"""Assignment of targets to candidates by closest value (ex: books matched by number of tokens).
+
+The cost of matching a target to a candidate is the absolute difference of their values, so there is always an
+optimal assignment that preserves the order of the sorted values. It is found by dynamic programming over the
+sorted values instead of solving a dense |targets| x |candidates| assignment problem (`linear_sum_assignment`).
+
+usage: python -m lm_benchmark.datasets.machine_cdi.matching [--sizes 200 2000 ...] (benchmark against scipy)
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment  # type: ignore[import-untyped]
+
+
+def candidate_window(targets: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Mask of the sorted candidates that can be part of an optimal assignment.
+
+    A target is never matched further than its n-th closest candidate on either side (n: number of targets):
+    one of the n closest is free and would cost less. Only candidates within these windows are kept.
+    """
+    n, m = len(targets), len(candidates)
+    pos = np.searchsorted(candidates, targets)
+    bounds = np.zeros(m + 1, dtype=np.int64)
+    np.add.at(bounds, np.clip(pos - n, 0, m), 1)
+    np.add.at(bounds, np.clip(pos + n, 0, m), -1)
+    return np.cumsum(bounds[:-1]) > 0
+
+
+def _order_preserving_assignment(targets: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Optimal order-preserving assignment of sorted targets to sorted candidates (index of each candidate).
+
+    g[i, k]: cost of matching targets[:i + 1] with candidates[:i + k + 1],
+    g[i, k] = min(g[i, k - 1], |targets[i] - candidates[i + k]| + g[i - 1, k]); k only ranges over m - n + 1 slots.
+    """
+    n, m = len(targets), len(candidates)
+    width = m - n + 1
+    g = np.zeros(width)
+    # record[i, k]: whether targets[i] matched to candidates[i + k] reaches g[i, k] (bit-packed)
+    record = np.empty((n, (width + 7) // 8), dtype=np.uint8)
+    for i in range(n):
+        h = np.abs(targets[i] - candidates[i : i + width]) + g
+        g = np.minimum.accumulate(h)
+        record[i] = np.packbits(h == g)
+
+    # Backtrack from the last target: its match is the last record at or before the bound
+    matches = np.empty(n, dtype=np.int64)
+    k = width - 1
+    for i in range(n - 1, -1, -1):
+        k = int(np.flatnonzero(np.unpackbits(record[i], count=k + 1))[-1])
+        matches[i] = i + k
+    return matches
+
+
+def _find(links: list[int], i: int) -> int:
+    """Root of a position in a union-find forest (with path compression)."""
+    root = i
+    while links[root] != root:
+        root = links[root]
+    while links[i] != root:
+        links[i], i = root, links[i]
+    return root
+
+
+def _greedy_assignment(targets: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Approximate assignment: each sorted target takes the closest free candidate."""
+    m = len(candidates)
+    # first free candidate at or after j: _find(right, j) (m if none)
+    right = list(range(m + 1))
+    # first free candidate at or before j: _find(left, j + 1) - 1 (-1 if none)
+    left = list(range(m + 1))
+
+    matches = np.empty(len(targets), dtype=np.int64)
+    for i, pos in enumerate(np.searchsorted(candidates, targets).tolist()):
+        r, lo = _find(right, pos), _find(left, pos) - 1
+        # the free candidate on the right is taken if there is none on the left or if it is not further
+        best = r if lo < 0 or (r < m and candidates[r] - targets[i] <= targets[i] - candidates[lo]) else lo
+        matches[i] = best
+        right[best] = best + 1
+        left[best + 1] = best
+    return matches
+
+
+def match_values(targets: np.ndarray, candidates: np.ndarray, *, exact: bool = True) -> np.ndarray:
+    """Assign a distinct candidate to each target, minimizing the sum of absolute differences of their values.
+
+    With `exact=False`, targets take the closest free candidate in increasing order (faster, not optimal).
+
+    Returns
+    -------
+        the index of the candidate assigned to each target
+
+    Raises
+    ------
+        ValueError if there are less candidates than targets
+
+    """
+    targets, candidates = np.asarray(targets, dtype=float), np.asarray(candidates, dtype=float)
+    if len(candidates) < len(targets):
+        raise ValueError(f"Not enough candidates ({len(candidates)}) to match {len(targets)} targets")
+    if len(targets) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    target_order = np.argsort(targets, kind="stable")
+    candidate_order = np.argsort(candidates, kind="stable")
+    sorted_candidates = candidates[candidate_order]
+    if exact:
+        kept = np.flatnonzero(candidate_window(targets[target_order], sorted_candidates))
+        matches = kept[_order_preserving_assignment(targets[target_order], sorted_candidates[kept])]
+    else:
+        matches = _greedy_assignment(targets[target_order], sorted_candidates)
+
+    result = np.empty(len(targets), dtype=np.int64)
+    result[target_order] = candidate_order[matches]
+    return result
+
+
+def benchmark(sizes: list[int], ratio: int = 10, seed: int = 0) -> None:
+    """Compare the assignments & their running times with the Hungarian algorithm (scipy)."""
+    rng = np.random.default_rng(seed)
+    columns = ("targets", "candidates", "scipy (s)", "exact (s)", "greedy (s)", "greedy gap")
+    print(" ".join(f"{c:>10}" for c in columns))
+    for n in sizes:
+        targets = rng.lognormal(10, 1, n).round()
+        candidates = rng.lognormal(10, 1, n * ratio).round()
+
+        start = time.perf_counter()
+        _, hungarian = linear_sum_assignment(np.abs(targets[:, None] - candidates))
+        scipy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        exact = match_values(targets, candidates)
+        exact_time = time.perf_counter() - start
+        start = time.perf_counter()
+        greedy = match_values(targets, candidates, exact=False)
+        greedy_time = time.perf_counter() - start
+
+        best = np.abs(targets - candidates[hungarian]).sum()
+        if not np.isclose(np.abs(targets - candidates[exact]).sum(), best):
+            raise ValueError(f"Exact assignment is not optimal for {n} targets !!")
+        gap = np.abs(targets - candidates[greedy]).sum() / max(best, 1) - 1
+        print(f"{n:>10} {n * ratio:>10} {scipy_time:>10.3f} {exact_time:>10.3f} {greedy_time:>10.3f} {gap:>10.2%}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Benchmark the matching against the Hungarian algorithm."""
+    parser = argparse.ArgumentParser(description="Benchmark the matching of values against scipy")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 500, 1000, 2000])
+    parser.add_argument("--ratio", type=int, default=10, help="Number of candidates per target")
+    args = parser.parse_args(argv)
+    benchmark(args.sizes, ratio=args.ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,25 @@ TODO(@Jing or Nick): This should be replaced with phonemizer module.
 """
 
 import argparse
+import fcntl
+import functools
+import hashlib
+import json
+import os
 import re
-import string
 import typing as t
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from dp.phonemizer import Phonemizer  # type: ignore[import-untyped]
 from tqdm import tqdm
 
+from lm_benchmark import settings
+from lm_benchmark.utils import str2bool
+
+from .preprocess import format_chars
+from .text_cleaning import clean_line
+
 
 def parse_args() -> argparse.Namespace:
     """Parse commandline arguments."""
@@ -36,68 +47,133 @@ def parse_args() -> argparse.Namespace:
         default="en_us_cmudict_ipa_forward.pt",
         help="path to phonemizer",
     )
-    parser.add_argument("--debug", default=True, help="if debug, only do the first 2 lines")
+    parser.add_argument(
+        "--debug",
+        type=str2bool,
+        default=True,
+        help="if debug, only do the first 2 lines (chunks are not marked as done)",
+    )
     parser.add_argument(
         "--preserve_sequences",
         default=["iː", "uː", "ɝː", "ɑː", "oʊ", "aɪ", "eɪ", "dʒ", "aʊ", "tʃ", "ɔɪ"],
         help="preserved seq for phone segmentation",
     )
+    parser.add_argument("--batch_size", type=int, default=256, help="Number of words predicted at once")
+    parser.add_argument("--n_jobs", type=int, default=1, help="Number of chunks phonemized in parallel")
+    parser.add_argument("--force", action="store_true", help="Phonemize chunks already marked as done")
     return parser.parse_args()
 
 
-def clean_txt(sent: str) -> str:
-    """Clean the input string."""
-    # Filter out non-ASCII characters
-    sent = "".join(char for char in sent if ord(char) < 128)
-    # remove punctuations
-    translator = str.maketrans("", "", string.punctuation + string.digits)
-    translator[ord("-")] = ord(" ")  # Replace hyphen with blank space
-    clean_string = sent.translate(translator).lower()  # lower results
-    clean_string = re.sub(r"\s+", " ", clean_string)  # remove redundent blank
-    return clean_string.strip()
+# Language of the phonemizer checkpoint
+LANG = "en_us"
 
 
-def phonemize(sent: str, preserve_sequences: list, phonemizer: t.Callable) -> tuple[str, str]:
-    """Estimate the list of phonemes corresponding to the given input."""
-    # Escape special characters in preserve_sequences to avoid regex issues
-    escaped_sequences = [re.escape(seq) for seq in preserve_sequences]
+class PhonemeCache:
+    """Persistent word -> phonemes mapping.
+
+    The mapping is stored as a JSON file per phonemizer checkpoint, keyed by the checkpoint path, modification time
+    & size, so a different (or retrained) checkpoint never reuses previous phonemes.
+    """
 
+    def __init__(self, checkpoint: str | Path, root: Path | None = None) -> None:
+        if root is None:
+            root = settings.cache_dir() / "phonemes"
+        root.mkdir(exist_ok=True, parents=True)
+        checkpoint = Path(checkpoint)
+        stat = checkpoint.stat()
+        digest = hashlib.sha1(str(checkpoint.resolve()).encode("utf-8"), usedforsecurity=False).hexdigest()
+        self.file = root / f"{checkpoint.stem}-{digest}-{stat.st_mtime_ns}-{stat.st_size}-{LANG}.json"
+        self._phones: dict[str, str] | None = None
+
+    @property
+    def phones(self) -> dict[str, str]:
+        """Cached phonemes (loaded on first access)."""
+        if self._phones is None:
+            self._phones = json.loads(self.file.read_text()) if self.file.is_file() else {}
+        return self._phones
+
+    def save(self) -> None:
+        """Write the cache to disk (merged with phonemes saved meanwhile by other processes).
+
+        The read-merge-write runs under an exclusive lock of a sidecar file, so concurrent saves are serialized.
+        """
+        with self.file.with_suffix(".lock").open("w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self.file.is_file():
+                self._phones = {**json.loads(self.file.read_text()), **self.phones}
+            tmp_file = self.file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(self.phones, ensure_ascii=False))
+            tmp_file.replace(self.file)
+
+
+def phonemize_words(
+    words: t.Iterable[str],
+    phonemizer: t.Callable,
+    *,
+    cache: PhonemeCache | None = None,
+    batch_size: int = 256,
+    block_size: int = 10_000,
+) -> dict[str, str]:
+    """Phonemes of each unique word.
+
+    Words missing from the cache are phonemized in blocks of `block_size` words (the cache is saved after each block,
+    so an interrupted run resumes where it stopped); the model predicts `batch_size` words at once.
+    """
+    phones = {} if cache is None else cache.phones
+    missing = [w for w in dict.fromkeys(words) if w not in phones]
+
+    for start in tqdm(range(0, len(missing), block_size), unit="block", disable=not missing):
+        block = missing[start : start + block_size]
+        if hasattr(phonemizer, "phonemise_list"):
+            # Phonemizer.__call__ does not forward the batch size to the model
+            block_phones = phonemizer.phonemise_list(block, lang=LANG, batch_size=batch_size).phonemes
+        else:
+            block_phones = phonemizer(block, lang=LANG)
+        phones.update(zip(block, block_phones, strict=True))
+        if cache is not None:
+            cache.save()
+    return phones
+
+
+@functools.cache
+def compile_segmenter(preserve_sequences: tuple[str, ...]) -> t.Callable[[str], tuple[str, ...]]:
+    """Build a function splitting phonemes into their segmented words (memoized for each phoneme string)."""
     # Create a regex pattern to match the sequences that should be preserved
-    preserve_pattern = "|".join(escaped_sequences)
-
-    # Initialize the final strings
-    processed_phon_with = ""
-    processed_phon_without = ""
-
-    def segment_word(word: str) -> list[str]:
-        """Function to segment the word."""
-        # Split the word by preserved sequences.
-        parts = re.split(f"({preserve_pattern})", word)
-        # Remove any empty strings from the list
-        parts = [part for part in parts if part]
-        segmented = []
-        for part in parts:
-            if re.fullmatch(preserve_pattern, part):
-                # If the part matches a preserved sequence, add it directly
-                segmented.append(part)
-            else:
-                # Otherwise, split the part into individual characters
-                segmented.extend(part)
-        return segmented
-
-    # Split the input string into words
-    phon_string = phonemizer(sent, lang="en_us")
-    words = phon_string.split()
-    for word in words:
-        segmented_word = segment_word(word)
-        processed_phon_with += " ".join(segmented_word) + " | "
-        processed_phon_without += " ".join(segmented_word) + " "
+    pattern = re.compile("|".join(re.escape(seq) for seq in preserve_sequences))
+
+    def segment_word(word: str) -> str:
+        """Split a word into preserved sequences & single characters."""
+        if not preserve_sequences:
+            return " ".join(word)
+        segmented: list[str] = []
+        pos = 0
+        for match in pattern.finditer(word):
+            segmented.extend(word[pos : match.start()])
+            segmented.append(match.group())
+            pos = match.end()
+        segmented.extend(word[pos:])
+        return " ".join(segmented)
+
+    @functools.cache
+    def segment(phones: str) -> tuple[str, ...]:
+        return tuple(segment_word(word) for word in phones.split())
+
+    return segment
+
+
+def format_phones(segmented: t.Sequence[str]) -> tuple[str, str]:
+    """Phonemes of a sentence with & without word boundaries."""
+    processed_phon_with = "".join(f"{word} | " for word in segmented)
+    processed_phon_without = "".join(f"{word} " for word in segmented)
 
     # Strip the trailing separators and remove leading/trailing blanks
-    processed_phon_with = processed_phon_with.rstrip("|").strip()
-    processed_phon_without = processed_phon_without.rstrip(" ").strip()
+    return processed_phon_with.rstrip("|").strip(), processed_phon_without.rstrip(" ").strip()
+
 
-    return processed_phon_with, processed_phon_without
+def phonemize(sent: str, preserve_sequences: list, phonemizer: t.Callable) -> tuple[str, str]:
+    """Estimate the list of phonemes corresponding to the given input."""
+    segment = compile_segmenter(tuple(preserve_sequences))
+    return format_phones(segment(phonemizer(sent, lang=LANG)))
 
 
 def preprocess(
@@ -106,34 +182,34 @@ def preprocess(
     phonemizer: t.Callable,
     *,
     debug: bool = False,
+    cache: PhonemeCache | None = None,
+    batch_size: int = 256,
 ) -> tuple[list[str], ...]:
     """Preprocessing before phonemization.
 
+    Unique words of all lines are phonemized at once (in batches), sentences are assembled from their words.
+
     input: the string list
     return: the cleaned files
     """
     raw = [line.strip() for line in raw if line.strip()]
     if debug:  # only phonemize the first 2 line s
         raw = raw[:2]
+    sent_all = [clean_line(sent) for sent in raw]
+    phones = phonemize_words(
+        (word for sent in sent_all for word in sent.split()), phonemizer, cache=cache, batch_size=batch_size
+    )
+    segment = compile_segmenter(tuple(preserve_sequences))
+
     processed_without_phon_all = []
     processed_with_phon_all = []
     processed_without_all = []
     processed_with_all = []
-    sent_all = []
-    for sent in tqdm(raw):
-        clean_string = clean_txt(sent)
-        processed_phon_without, processed_phon_with = phonemize(clean_string, preserve_sequences, phonemizer)
-        word_lst = clean_string.split(" ")
-        # convert into corresponding format string
-        processed_with = ""
-        processed_without = ""
-        for word in word_lst:
-            upper_char = " ".join(word).upper()
-            if not word.isspace():
-                processed_with += upper_char + " | "
-                processed_without += upper_char + " "
-
-        sent_all.append(clean_string)
+    for clean_string in tqdm(sent_all):
+        segmented = [seg for word in clean_string.split() for seg in segment(phones[word])]
+        processed_phon_with, processed_phon_without = format_phones(segmented)
+        processed_with, processed_without = format_chars(clean_string)
+
         processed_without_all.append(processed_without)
         processed_with_all.append(processed_with)
         processed_without_phon_all.append(processed_phon_without)
@@ -150,6 +226,8 @@ def write_files(
     phonemizer: t.Callable,
     *,
     debug: bool = False,
+    cache: PhonemeCache | None = None,
+    batch_size: int = 256,
 ) -> None:
     """Write all the processed files fom a single raw file."""
     print(f"Loading raw file from {raw_path}")
@@ -159,14 +237,15 @@ def write_files(
         preserve_sequences,
         phonemizer,
         debug=debug,
+        cache=cache,
+        batch_size=batch_size,
     )
 
     # wrtie out the results
     def write(f: Path, item_list: list[str]) -> None:
         """Write a list of results in a given file."""
         with f.open("w") as fh:
-            for item in item_list:
-                fh.write(f"{item}\n")
+            fh.writelines(f"{item}\n" for item in item_list)
 
     out_path.mkdir(parents=True, exist_ok=True)
 
@@ -186,21 +265,71 @@ def write_files(
     print(f"Writing cleaned file to {out_path / 'phon_without.txt'}")
 
 
+# Marker written in a chunk directory once all its files are written
+DONE_MARKER = ".phonemized"
+
+# Phonemizer & cache of a worker process (loaded once per worker)
+_worker: dict[str, t.Any] = {}
+
+
+def _init_worker(phonemizer_path: str) -> None:
+    _worker["phonemizer"] = Phonemizer.from_checkpoint(phonemizer_path)
+    _worker["cache"] = PhonemeCache(phonemizer_path)
+
+
+def process_chunk(
+    chunk: Path,
+    preserve_sequences: list,
+    phonemizer: t.Callable | None = None,
+    *,
+    debug: bool = False,
+    cache: PhonemeCache | None = None,
+    batch_size: int = 256,
+) -> Path:
+    """Write the processed files of a chunk directory & mark it as done (the worker phonemizer is used if none).
+
+    In debug mode only the first lines are processed, so the chunk is not marked as done.
+    """
+    if phonemizer is None:
+        phonemizer, cache = _worker["phonemizer"], _worker["cache"]
+    write_files(chunk, chunk, preserve_sequences, phonemizer, debug=debug, cache=cache, batch_size=batch_size)
+    if not debug:
+        (chunk / DONE_MARKER).touch()
+    return chunk
+
+
 def main() -> None:
     """Main function allowing to call phonemizer."""
     # load args
     args = parse_args()
     raw_path = Path(args.raw_path)
-
     preserve_sequences = args.preserve_sequences
-    phonemizer_path = "en_us_cmudict_ipa_forward.pt"
-    phonemizer = Phonemizer.from_checkpoint(phonemizer_path)
-    print(f"Have loaded phonemizer from {phonemizer_path}")
-
-    # loop different chunks
-    for chunk in raw_path.iterdir():
-        if chunk.is_dir():
+    phonemizer_path = args.phonemizer_path
+
+    # chunks already processed by a previous run are skipped
+    chunks = sorted(c for c in raw_path.iterdir() if c.is_dir() and (args.force or not (c / DONE_MARKER).is_file()))
+    print(f"Phonemizing {len(chunks)} chunks from {raw_path}")
+
+    if args.n_jobs <= 1:
+        phonemizer = Phonemizer.from_checkpoint(phonemizer_path)
+        print(f"Have loaded phonemizer from {phonemizer_path}")
+        # phonemes of words are shared by all chunks (& later runs)
+        cache = PhonemeCache(phonemizer_path)
+        for chunk in chunks:
             print(f"Loading files from {chunk}")
-            write_files(chunk, chunk, preserve_sequences, phonemizer, debug=args.debug)
+            process_chunk(
+                chunk, preserve_sequences, phonemizer, debug=args.debug, cache=cache, batch_size=args.batch_size
+            )
             print("########################")
             print(f"Finished preprocessing files from {chunk}")
+        return
+
+    # each worker loads the phonemizer once & processes chunks from the queue
+    pool = ProcessPoolExecutor(max_workers=args.n_jobs, initializer=_init_worker, initargs=(phonemizer_path,))
+    with pool as executor:
+        futures = [
+            executor.submit(process_chunk, chunk, preserve_sequences, debug=args.debug, batch_size=args.batch_size)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            print(f"Finished preprocessing files from {future.result()}")
@@ -1,12 +1,14 @@
 import argparse
-import collections
-import re
-import string
+import collections.abc
+import csv
+import typing as t
 from pathlib import Path
 
 import pandas as pd
 from tqdm import tqdm
 
+from .text_cleaning import clean_line
+
 
 def parse_arguments() -> argparse.Namespace:
     """Parse Command Line arguments."""
@@ -48,7 +50,7 @@ def remove_blank(s: str) -> str:
     return s.strip()
 
 
-def get_len(x: collections.Sized) -> int:
+def get_len(x: collections.abc.Sized) -> int:
     """Returns the length of an object."""
     try:
         return len(x)
@@ -62,16 +64,19 @@ def count_words(sentence: str) -> int:
     return len(words)
 
 
-def clean_txt(sent: str) -> str:
-    """Clean the input string."""
-    # Filter out non-ASCII characters
-    sent = "".join(char for char in sent if ord(char) < 128)
-    # remove punctuations
-    translator = str.maketrans("", "", string.punctuation + string.digits)
-    translator[ord("-")] = ord(" ")  # Replace hyphen with blank space
-    clean_string = sent.translate(translator).lower()
-    clean_string = re.sub(r"\s+", " ", clean_string)
-    return clean_string.strip()
+def format_chars(clean_string: str) -> tuple[str, str]:
+    """Characters of a cleaned sentence in upper case, with & without word boundaries."""
+    # convert into corresponding format string
+    words = [" ".join(word).upper() for word in clean_string.split(" ") if not word.isspace()]
+    return "".join(f"{word} | " for word in words), "".join(f"{word} " for word in words)
+
+
+def iter_utterances(raw: t.Iterable[str]) -> t.Iterator[tuple[str, str, str]]:
+    """Stream the cleaned utterances of non-blank lines, with their characters with & without word boundaries."""
+    for sent in raw:
+        if sent.strip():
+            clean_string = clean_line(sent)
+            yield clean_string, *format_chars(clean_string)
 
 
 def preprocess(raw: list[str]) -> tuple[list[str], list[str], list[str]]:
@@ -82,35 +87,31 @@ def preprocess(raw: list[str]) -> tuple[list[str], list[str], list[str]]:
         the cleaned files
 
     """
-    raw = [line.strip() for line in raw if line.strip()]
-    processed_without_all = []
-    processed_with_all = []
     sent_all = []
-    for sent in tqdm(raw):
-        clean_string = clean_txt(sent)
-        word_lst = clean_string.split(" ")
-        # convert into corresponding format string
-        processed_with = ""
-        processed_without = ""
-        for word in word_lst:
-            upper_char = " ".join(word).upper()
-            if not word.isspace():
-                processed_with += upper_char + " | "
-                processed_without += upper_char + " "
-
+    processed_with_all = []
+    processed_without_all = []
+    for clean_string, processed_with, processed_without in iter_utterances(tqdm(raw)):
         sent_all.append(clean_string)
-        processed_without_all.append(processed_without)
         processed_with_all.append(processed_with)
+        processed_without_all.append(processed_without)
     # convert the final results into
     return sent_all, processed_with_all, processed_without_all
 
 
-def get_utt_frame(sent: list, file: str, all_frame: pd.DataFrame) -> pd.DataFrame:
-    """Save the cleaned utt as a dataframe."""
-    utt_frame = pd.DataFrame(sent)
-    utt_frame = utt_frame.rename(columns={0: "train"})
-    utt_frame["filename"] = file
-    return pd.concat([all_frame, utt_frame])
+def write_train_set(txt_files: t.Iterable[str], dataset_path: Path, utt_file: Path, data_file: Path) -> None:
+    """Write the utterances of a list of texts (CSV) & their characters with word boundaries (fairseq input).
+
+    Texts are streamed line by line & rows are written as they are processed, memory does not grow with the
+    size of the train set. The CSV has the layout of the former concatenated frames (index restarting for each text).
+    """
+    with utt_file.open("w", newline="") as utt_fh, data_file.open("w") as data_fh:
+        writer = csv.writer(utt_fh, lineterminator="\n")
+        writer.writerow(["", "train", "filename"])
+        for txt_file in tqdm(txt_files, unit="file"):
+            with (dataset_path / txt_file).open("r") as f:
+                for i, (clean_string, processed_with, _) in enumerate(iter_utterances(f)):
+                    writer.writerow([i, clean_string, txt_file])
+                    data_fh.write(f"{processed_with}\n")
 
 
 def main() -> None:
@@ -132,28 +133,12 @@ def main() -> None:
         if file.suffix == ".csv":
             # load training data based on filename list
             file_lst = pd.read_csv(file, header=None)
-            all_frame = pd.DataFrame()
-            train = []
-            for txt_file in file_lst[0]:
-                with (dataset_path / txt_file).open("r") as f:
-                    raw = f.readlines()
-                    sent_all, processed_with, _ = preprocess(raw)
-                    all_frame = get_utt_frame(sent_all, txt_file, all_frame)
-                    train.extend(processed_with)
-
-            # save the utt csv file
-            all_frame.to_csv(utt_path / file.name)
-            print(f"Finish prepare utt for {file}")
-
             out_path = mat_path / file.stem
             if not out_path.is_dir():
                 out_path.mkdir(parents=True)
 
-            # Open the file in write mode
-            with (out_path / "data.txt").open("w") as f:
-                # Write each element of the list to the file
-                for item in train:
-                    f.write(f"{item}\n")
+            # save the utt csv file & the training data
+            write_train_set(file_lst[0], dataset_path, utt_path / file.name, out_path / "data.txt")
             print(f"Finish preprocessing {file}")
 
 
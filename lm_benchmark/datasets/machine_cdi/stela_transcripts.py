@@ -2,12 +2,20 @@
 
 import collections
 import dataclasses
+import os
+import shutil
 import typing as t
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
+import numpy as np  # noqa: E402
 import pandas as pd  # noqa: E402 (Deprecation avoid)
+from tqdm import tqdm  # noqa: E402
+
+from .token_corpus import TokenCorpus  # noqa: E402
+from .tree_index import TreeIndex  # noqa: E402
 
 
 def clean_text(text: str) -> str:
@@ -16,17 +24,72 @@ def clean_text(text: str) -> str:
     return text
 
 
-def word_frequency(file_list: list[Path], *, as_df: bool = True) -> pd.DataFrame | collections.Counter:
-    """Build a word frequency mapping (Requires clean text)."""
-    words = []
-    for text_files in file_list:
-        content = text_files.read_text()
-        words.extend(content.split(" "))
+# Size of the blocks read when counting words
+READ_BLOCK_SIZE = 1 << 20
+
+
+def count_words(file: Path) -> collections.Counter:
+    """Count the words (separated by any whitespace) of a text file, read in blocks."""
+    counts: collections.Counter = collections.Counter()
+    rest = ""
+    with file.open() as fh:
+        while block := fh.read(READ_BLOCK_SIZE):
+            words = (rest + block).split()
+            # the last word may continue in the next block
+            rest = words.pop() if words and not block[-1].isspace() else ""
+            counts.update(words)
+    if rest:
+        counts[rest] += 1
+    return counts
+
+
+def word_frequency(
+    file_list: list[Path], *, as_df: bool = True, n_jobs: int | None = None
+) -> pd.DataFrame | collections.Counter:
+    """Build a word frequency mapping (Requires clean text).
+
+    Files are counted in a process pool (one counter per file, merged as they complete).
+    """
+    counts: collections.Counter = collections.Counter()
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        for file_counts in executor.map(count_words, file_list):
+            counts.update(file_counts)
 
     # Return a count of all words in the dataset
     if as_df:
-        return pd.DataFrame.from_records(list(collections.Counter(words).items()), columns=["word", "freq"])
-    return collections.Counter(words)
+        return pd.DataFrame(
+            {
+                "word": pd.Series(list(counts.keys()), dtype=str),
+                "freq": np.fromiter(counts.values(), dtype=np.int64, count=len(counts)),
+            }
+        )
+    return counts
+
+
+@dataclasses.dataclass
+class BookText:
+    """A book transcription, read once for all the splits using it."""
+
+    path: Path
+    text: str | None  # the cleaned text, None if the file can be copied as is
+
+
+def copy_file(src: Path, fh: t.BinaryIO) -> None:
+    """Append the content of a file to an open file (in kernel space with sendfile when available)."""
+    fh.flush()
+    with src.open("rb") as src_fh:
+        size = os.fstat(src_fh.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(fh.fileno(), src_fh.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            # sendfile not supported between these files
+            src_fh.seek(offset)
+            shutil.copyfileobj(src_fh, fh)
 
 
 @dataclasses.dataclass
@@ -115,18 +178,15 @@ class InfTrainStructure:
 
     def iter_wavs(self) -> t.Iterable[AudioRow]:
         """An iterable over all the architecture of wavs."""
-        for hour in self.hours_split:
-            for split in self.split_codes(hour):
-                for speaker in self.speaker_ids(hour, split):
-                    for book in self.book_ids(hour, split, speaker):
-                        yield from [
-                            AudioRow(language=self.lang, hour=hour, split=split, speaker=speaker, book=book, wav=wav)
-                            for wav in self.wavs(hour, split, speaker, book)
-                        ]
-
-    def wav_split_associations(self) -> pd.DataFrame:
-        """Build wav associations DataFrame."""
-        return pd.DataFrame.from_records([dataclasses.asdict(row) for row in self.iter_wavs()])
+        for row in self.wav_split_associations().itertuples(index=False):
+            yield AudioRow(*row)
+
+    def wav_split_associations(self, n_threads: int = 32) -> pd.DataFrame:
+        """Build wav associations DataFrame.
+
+        The tree listing is cached, a new scan only lists the directories modified since the previous one.
+        """
+        return TreeIndex(self.tree_root).to_df(n_threads, language=self.lang)
 
     def matched_metadata(self) -> pd.DataFrame:
         """Clean matched2.csv to keep only usefull items."""
@@ -214,19 +274,50 @@ class STELATranscripts:
         book_id_dict: dict[str, Path] = dict(associations.itertuples(index=False, name=None))  # type: ignore[arg-type,annotation-unchecked]
         self.books = book_id_dict
 
-    def merge_transcriptions(self, book_list: list[str], target: Path) -> None:
-        """Write a book list into a single file."""
+    def load_book(self, book: str) -> BookText:
+        """Read a book transcription (its text is only kept if cleaning changed it)."""
+        text_path = self.books[book]
+        raw = text_path.read_bytes()
+        # decoded as `read_text` (universal newlines)
+        text = raw.decode().replace("\r\n", "\n").replace("\r", "\n")
+        cleaned = clean_text(text)
+        copy_as_is = cleaned == text and b"\r" not in raw
+        return BookText(path=text_path, text=None if copy_as_is else cleaned)
+
+    def load_books(self, book_list: t.Iterable[str], n_threads: int = 16) -> dict[str, BookText]:
+        """Read books (each once) in a thread pool.
+
+        Raises
+        ------
+            ValueError if a book has no transcription
+
+        """
         # build book index
         self.build_book_dict()
-
-        with target.open("w") as fh:
+        book_list = sorted(set(book_list))
+        for book in book_list:
+            if book not in self.books:
+                raise ValueError(f"Not found {book}")
+
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            loaded = tqdm(executor.map(self.load_book, book_list), total=len(book_list), unit="book")
+            return dict(zip(book_list, loaded, strict=True))
+
+    @staticmethod
+    def write_transcription(book_list: list[str], books: dict[str, BookText], target: Path) -> None:
+        """Write loaded books into a single file (unchanged files are copied without being read again)."""
+        with target.open("wb", buffering=1 << 20) as fh:
             for book in book_list:
-                text_path = self.books.get(book, None)
-                if text_path is None:
-                    raise ValueError(f"Not found {book}")
+                loaded = books[book]
+                if loaded.text is None:
+                    copy_file(loaded.path, fh)
+                else:
+                    fh.write(loaded.text.encode())
+                fh.write(b" ")
 
-                fh.write(clean_text(text_path.read_text()))
-                fh.write(" ")
+    def merge_transcriptions(self, book_list: list[str], target: Path) -> None:
+        """Write a book list into a single file."""
+        self.write_transcription(book_list, self.load_books(book_list), target)
 
     def iter_transcriptions_by_split(self) -> t.Iterable[tuple[str, str, list[str]]]:
         """Load transcriptions by split category."""
@@ -241,18 +332,29 @@ class STELATranscripts:
             booklist = list(set(str(row.book).split(",")))
             yield f"{row.hour}", f"{row.split:02}", booklist
 
-    def mk_train(self, root_dir: Path | None = None) -> None:
+    def mk_train(self, root_dir: Path | None = None, n_threads: int = 16) -> None:
         """Make train folder architecture."""
         if root_dir is None:
             root_dir = self.train_dir
 
         root_dir = root_dir / self.lang
-        for hour, split, booklist in self.iter_transcriptions_by_split():
+        splits = list(self.iter_transcriptions_by_split())
+        # Books shared by several splits are read once
+        books = self.load_books((book for _, _, booklist in splits for book in booklist), n_threads=n_threads)
+
+        for hour, split, booklist in tqdm(splits, unit="split"):
             # Create folder
             (root_dir / hour / split).mkdir(exist_ok=True, parents=True)
             # Write transcriptions into file
-            self.merge_transcriptions(booklist, root_dir / hour / split / "transcription.txt")
-            # TODO: add tokenized transcriptions
-            # TODO: add word_frequency
+            transcription_file = root_dir / hour / split / "transcription.txt"
+            self.write_transcription(booklist, books, transcription_file)
+            # Tokenize transcriptions once (memory-mapped token ids)
+            corpus = TokenCorpus.from_text_file(transcription_file, root_dir / hour / split / "tokens")
+            # Write word frequencies of the split from its token ids (books are separated by blanks,
+            # as `word_frequency` on its books), only the counts of the current split are kept in memory
+            counts = corpus.counter()
+            pd.DataFrame({"word": list(counts.keys()), "freq": list(counts.values())}).to_csv(
+                root_dir / hour / split / "word_frequency.csv", index=False
+            )
             # Write list of books used for transcription
             (root_dir / hour / split / "books.txt").write_text("\n".join(booklist))
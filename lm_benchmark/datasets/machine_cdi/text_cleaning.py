@@ -0,0 +1,81 @@
+"""Cleaning of training transcriptions: ASCII only, no punctuation nor digits, lower case, single spaces.
+
+Lines are cleaned at the bytes level, with a translation table built once; columns of texts are cleaned at once
+by joining them into a single bytes buffer.
+"""
+
+import re
+import string
+import time
+import typing as t
+from pathlib import Path
+
+import pandas as pd
+from tqdm import tqdm
+
+# Characters removed from texts (hyphens are replaced by a space)
+DELETED_CHARS = (string.punctuation + string.digits).replace("-", "").encode("ascii")
+# ASCII characters that `str.split` (but not `bytes.split`) treats as whitespace
+_EXTRA_WHITESPACE = b"\x0b\x1c\x1d\x1e\x1f"
+_TRANSLATION = bytes.maketrans(b"-" + _EXTRA_WHITESPACE, b" " * (1 + len(_EXTRA_WHITESPACE)))
+# Runs of ASCII whitespace other than new-lines (texts of a column are separated by new-lines)
+_BLANKS = re.compile(rb"[ \t\r\x0b\x0c]+")
+# Blanks around the separators
+_SEPARATOR_BLANKS = re.compile(rb" ?\n ?")
+
+
+def clean_words(sent: str) -> list[str]:
+    """Words of a line of text, once cleaned."""
+    # Filter out non-ASCII characters, punctuation & digits
+    clean_bytes = sent.encode("ascii", "ignore").translate(_TRANSLATION, DELETED_CHARS).lower()
+    return clean_bytes.decode("ascii").split()
+
+
+def clean_line(sent: str) -> str:
+    """Clean a line of text."""
+    # Remove redundant & trailing blanks
+    return " ".join(clean_words(sent))
+
+
+def clean_lines(lines: t.Iterable[str], *, progress: bool = True) -> list[str]:
+    """Clean lines of text (the progress bar reports the throughput)."""
+    return [clean_line(line) for line in tqdm(lines, unit="line", disable=not progress)]
+
+
+def clean_series(texts: pd.Series, *, verbose: bool = False) -> pd.Series:
+    """Clean a column of texts (as `clean_line` on each text, the throughput is printed if verbose).
+
+    Texts are joined by new-lines into one bytes buffer, which is translated & whose blanks are squeezed at once,
+    before being split back into texts; columns where a text contains a new-line are cleaned text by text.
+    """
+    start = time.perf_counter()
+    values = texts.tolist()
+    joined = "\n".join(values)
+    if not values or joined.count("\n") != len(values) - 1:
+        cleaned = [clean_line(text) for text in values]
+    else:
+        clean_bytes = joined.encode("ascii", "ignore").translate(_TRANSLATION, DELETED_CHARS).lower()
+        clean_bytes = _SEPARATOR_BLANKS.sub(b"\n", _BLANKS.sub(b" ", clean_bytes)).strip(b" ")
+        cleaned = clean_bytes.decode("ascii").split("\n")
+
+    result = pd.Series(cleaned, index=texts.index, name=texts.name)
+    if verbose:
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"Cleaned {len(values)} texts in {elapsed:.2f}s ({len(values) / elapsed:,.0f} texts/s)")
+    return result
+
+
+def count_tokens(texts: pd.Series) -> pd.Series:
+    """Number of word-tokens of each text."""
+    return texts.str.split().str.len().fillna(0).astype(int)
+
+
+def file_token_stats(file: Path) -> tuple[int, int]:
+    """Number of word-tokens & of non-empty lines of a text file once cleaned (the file is streamed)."""
+    num_tokens = num_lines = 0
+    with file.open(encoding="utf8") as fh:
+        for line in fh:
+            count = len(clean_words(line))
+            num_tokens += count
+            num_lines += count > 0
+    return num_tokens, num_lines
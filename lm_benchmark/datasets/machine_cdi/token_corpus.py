@@ -0,0 +1,149 @@
+"""Tokenized training corpora stored as memory-mapped token ids."""
+
+import array
+import collections
+import typing as t
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lm_benchmark.chunking import Chunker
+
+TOKENS_FILE = "tokens.u32"
+OFFSETS_FILE = "offsets.u64"
+VOCAB_FILE = "vocab.txt"
+
+
+def is_token_corpus(root: Path) -> bool:
+    """Whether a directory contains a token corpus."""
+    return (root / VOCAB_FILE).is_file()
+
+
+class TokenCorpus:
+    """A corpus tokenized once into token ids.
+
+    root/
+        tokens.u32  : token ids of all lines, concatenated (uint32)
+        offsets.u64 : start of each line in tokens, followed by the total number of tokens (uint64)
+        vocab.txt   : the word of each token id (one per line)
+
+    Token ids & offsets are memory-mapped, slices of lines are views on the files (no copy, no parsing).
+    Lines are tokenized on whitespace (`str.split`), so words never contain new-lines.
+    """
+
+    def __init__(self, root: Path) -> None:
+        if not is_token_corpus(root):
+            raise ValueError(f"Given directory ::{root}:: does not contain a token corpus !!")
+        self.root = root
+        self.vocab: list[str] = (root / VOCAB_FILE).read_text(encoding="utf-8").split("\n")[:-1]
+        self.offsets = self._memmap(OFFSETS_FILE, np.uint64)
+        self.tokens = self._memmap(TOKENS_FILE, np.uint32)
+
+    def _memmap(self, name: str, dtype: type) -> np.ndarray:
+        file = self.root / name
+        if file.stat().st_size == 0:
+            # Empty files can not be memory-mapped
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r")
+
+    @classmethod
+    def build(cls, root: Path, lines: t.Iterable[str], batch_size: int = 1_000_000) -> "TokenCorpus":
+        """Tokenize lines into a corpus written to root (token ids are flushed to disk every batch_size tokens)."""
+        root.mkdir(exist_ok=True, parents=True)
+        vocab: dict[str, int] = {}
+        offsets = array.array("Q", [0])
+        batch: list[int] = []
+
+        with (root / TOKENS_FILE).open("wb") as fh:
+            for line in lines:
+                words = line.split()
+                batch.extend(vocab.setdefault(word, len(vocab)) for word in words)
+                offsets.append(offsets[-1] + len(words))
+                if len(batch) >= batch_size:
+                    np.array(batch, dtype=np.uint32).tofile(fh)
+                    batch = []
+            np.array(batch, dtype=np.uint32).tofile(fh)
+
+        np.array(offsets, dtype=np.uint64).tofile(root / OFFSETS_FILE)
+        (root / VOCAB_FILE).write_text("".join(f"{word}\n" for word in vocab), encoding="utf-8")
+        return cls(root)
+
+    @classmethod
+    def from_text_file(cls, txt_file: Path, root: Path) -> "TokenCorpus":
+        """Tokenize a text file (one line per utterance) into a corpus written to root."""
+        with txt_file.open(encoding="utf-8") as fh:
+            return cls.build(root, fh)
+
+    def __len__(self) -> int:
+        """Number of lines."""
+        return max(len(self.offsets) - 1, 0)
+
+    @property
+    def num_tokens(self) -> np.ndarray:
+        """Number of tokens of each line."""
+        return np.diff(self.offsets)
+
+    @property
+    def cum_tokens(self) -> np.ndarray:
+        """Cumulative number of tokens at the end of each line (a view, no computation)."""
+        return self.offsets[1:]
+
+    def chunker(self, *, repeat: bool = False) -> Chunker:
+        """Chunker of the lines by number of tokens (on the memory-mapped offsets, no copy)."""
+        return Chunker.from_cumsum(self.cum_tokens, repeat=repeat)
+
+    def line_ids(self, start: int, stop: int | None = None) -> np.ndarray:
+        """Token ids of lines [start, stop) as a view on the corpus (only line start if stop is None)."""
+        stop = start + 1 if stop is None else stop
+        return self.tokens[int(self.offsets[start]) : int(self.offsets[stop])]
+
+    def line(self, index: int) -> str:
+        """Text of a line."""
+        return " ".join(self.vocab[i] for i in self.line_ids(index))
+
+    def iter_lines(self, start: int = 0, stop: int | None = None) -> t.Iterator[str]:
+        """Iterate over the text of lines [start, stop)."""
+        for index in range(start, len(self) if stop is None else stop):
+            yield self.line(index)
+
+    def id_counts(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Count of each token id in lines [start, stop)."""
+        return np.bincount(self.line_ids(start, len(self) if stop is None else stop), minlength=len(self.vocab))
+
+    def counter(
+        self, start: int = 0, stop: int | None = None, predicate: t.Callable[[str], bool] | None = None
+    ) -> collections.Counter:
+        """Word counts of lines [start, stop), only words matching the predicate are kept if given."""
+        counts = self.id_counts(start, stop)
+        return collections.Counter(
+            {
+                self.vocab[i]: int(counts[i])
+                for i in np.flatnonzero(counts)
+                if predicate is None or predicate(self.vocab[i])
+            }
+        )
+
+    def ngram_counts(self, n: int, start: int = 0, stop: int | None = None) -> pd.DataFrame:
+        """Count n-grams of lines [start, stop), as `frequency_utils.count_ngrams` does.
+
+        Lines are concatenated (n-grams may span consecutive lines), n-grams are listed by first occurrence.
+        """
+        ids = self.line_ids(start, len(self) if stop is None else stop).astype(np.uint64)
+        if len(ids) < n:
+            return pd.DataFrame({"word": [], "count": [], "freq_m": []})
+
+        # Encode each n-gram as a single integer (base: vocabulary size)
+        base = np.uint64(max(len(self.vocab), 1))
+        if float(base) ** n >= 2.0**64:
+            raise ValueError(f"Vocabulary too large to encode {n}-grams")
+        codes = np.zeros(len(ids) - n + 1, dtype=np.uint64)
+        for k in range(n):
+            codes = codes * base + ids[k : len(ids) - n + 1 + k]
+
+        _, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        order = np.argsort(first, kind="stable")
+        words = [" ".join(self.vocab[i] for i in ids[first[j] : first[j] + n]) for j in order]
+        fre_table = pd.DataFrame({"word": words, "count": counts[order]})
+        fre_table["freq_m"] = fre_table["count"] / fre_table["count"].sum() * 1000000
+        return fre_table
@@ -0,0 +1,89 @@
+"""Index of the wav files of a split tree (root/hour/split/speaker/book/*.wav)."""
+
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from lm_benchmark import settings
+
+# Directory levels below the root of the tree
+LEVELS = ("hour", "split", "speaker", "book")
+
+
+class TreeIndex:
+    """Listing of a directory tree, rescanned incrementally.
+
+    The cache file maps each directory (relative POSIX path, "" for the root) to its mtime & its entries:
+    sub-directories for the intermediate levels, wav files for the books. Directories whose mtime did not change
+    since the last scan are not listed again (only a `stat` is needed); directories of a level are listed
+    concurrently in threads, as listing is dominated by filesystem latency (ex: network filesystems).
+    """
+
+    def __init__(self, root: Path, cache_file: Path | None = None) -> None:
+        if cache_file is None:
+            digest = hashlib.sha256(str(root.resolve()).encode()).hexdigest()[:16]
+            cache_file = settings.cache_dir() / "tree_index" / f"{root.name}-{digest}.json"
+        cache_file.parent.mkdir(exist_ok=True, parents=True)
+        self.root = root
+        self.cache_file = cache_file
+        self._dirs: dict[str, list] = json.loads(cache_file.read_text()) if cache_file.is_file() else {}
+
+    def _list(self, rel_dir: str, *, leaf: bool) -> tuple[str, list]:
+        """Entries of a directory (from the cache if its mtime did not change)."""
+        path = self.root / rel_dir
+        mtime = path.stat().st_mtime_ns
+        cached = self._dirs.get(rel_dir)
+        if cached is not None and cached[0] == mtime:
+            return rel_dir, cached
+
+        # os.scandir gets the entry types without an extra stat per entry
+        with os.scandir(path) as it:
+            names = [e.name for e in it if (e.name.endswith(".wav") if leaf else e.is_dir())]
+        return rel_dir, [mtime, sorted(names)]
+
+    def scan(self, n_threads: int = 32) -> dict[str, list[str]]:
+        """List the tree (level by level) & save the listing.
+
+        Returns
+        -------
+            the columns of the index (one value per wav file): hour, split, speaker, book & wav
+
+        """
+        scanned: dict[str, list] = {}
+        level_dirs = [""]
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            for depth in range(len(LEVELS) + 1):
+                leaf = depth == len(LEVELS)
+                listings = dict(executor.map(functools.partial(self._list, leaf=leaf), level_dirs))
+                scanned.update(listings)
+                if not leaf:
+                    level_dirs = [(Path(d) / name).as_posix() for d in level_dirs for name in listings[d][1]]
+
+        # Only the directories still in the tree are kept
+        self._dirs = scanned
+        self.save()
+
+        columns: dict[str, list[str]] = {name: [] for name in (*LEVELS, "wav")}
+        for book_dir in level_dirs:
+            wavs = scanned[book_dir][1]
+            for name, value in zip(LEVELS, Path(book_dir).parts, strict=True):
+                columns[name].extend([value] * len(wavs))
+            columns["wav"].extend(wavs)
+        return columns
+
+    def to_df(self, n_threads: int = 32, **constants: str) -> pd.DataFrame:
+        """Scan the tree into a DataFrame (with constant columns first, ex: language)."""
+        columns = self.scan(n_threads)
+        size = len(columns["wav"])
+        return pd.DataFrame({**{k: [v] * size for k, v in constants.items()}, **columns})
+
+    def save(self) -> None:
+        """Write the listing to the cache file."""
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(self._dirs))
+        tmp_file.replace(self.cache_file)
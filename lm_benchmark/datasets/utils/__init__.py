@@ -1,14 +1,36 @@
-from .cha.extract import CHAData, CHATranscriptions, extract_from_cha
-from .various import cha_phrase_cleaning, merge_word, remove_exp, segment_synonym, word_cleaning, word_to_pos
+from .cha.cache import CHACache
+from .cha.extract import CHAData, CHATranscriptions, count_words_from_cha, extract_from_cha, iter_cha_utterances
+from .cha.parser import Annotation, CHAHeader, CHAReader, Participant, read_header
+from .spacy_utils import POSCache, words_to_pos
+from .various import (
+    cha_phrase_cleaning,
+    cha_phrase_cleaning_batch,
+    merge_word,
+    remove_exp,
+    segment_synonym,
+    word_cleaning,
+    word_to_pos,
+)
 
 __all__ = [
+    "Annotation",
+    "CHAHeader",
+    "CHAReader",
+    "Participant",
+    "read_header",
+    "CHACache",
     "CHAData",
     "CHATranscriptions",
+    "count_words_from_cha",
     "extract_from_cha",
+    "iter_cha_utterances",
     "cha_phrase_cleaning",
+    "cha_phrase_cleaning_batch",
     "merge_word",
     "remove_exp",
     "segment_synonym",
     "word_cleaning",
     "word_to_pos",
+    "POSCache",
+    "words_to_pos",
 ]
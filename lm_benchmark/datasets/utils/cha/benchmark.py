@@ -0,0 +1,79 @@
+"""Benchmark the CHA phrase cleaners on real CHILDES transcriptions.
+
+usage: python -m lm_benchmark.datasets.utils.cha.benchmark [--transcript_dir DIR] [--max_files N]
+"""
+
+import argparse
+import itertools
+import time
+from pathlib import Path
+
+from lm_benchmark import settings
+from lm_benchmark.datasets.utils.various import cha_phrase_cleaning, cha_phrase_cleaning_batch
+
+from .extract import iter_cha_utterances
+
+
+def load_phrases(transcript_dir: Path, max_files: int | None = None) -> list[str]:
+    """Load the raw utterances of (at most max_files) CHA files."""
+    files = itertools.islice(sorted(transcript_dir.rglob("*.cha")), max_files)
+    return [content for file in files for _, content in iter_cha_utterances(file)]
+
+
+def benchmark_cleaning(phrases: list[str], batch_size: int = 10_000, repeat: int = 3) -> dict[str, float]:
+    """Time the line by line & the batch cleaners (best of `repeat` runs, in seconds).
+
+    Raises
+    ------
+        ValueError if the cleaners do not produce the same output
+
+    """
+
+    def line_by_line() -> list[str]:
+        return [cha_phrase_cleaning(p) for p in phrases]
+
+    def batched() -> list[str]:
+        return [
+            line
+            for i in range(0, len(phrases), batch_size)
+            for line in cha_phrase_cleaning_batch(phrases[i : i + batch_size])
+        ]
+
+    if line_by_line() != batched():
+        raise ValueError("Batch cleaning output differs from line by line cleaning !!")
+
+    timings = {}
+    for name, fn in (("line_by_line", line_by_line), ("batch", batched)):
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - start)
+        timings[name] = min(runs)
+    return timings
+
+
+def arguments() -> argparse.Namespace:
+    """Build & Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark CHA phrase cleaning")
+    parser.add_argument("--transcript_dir", type=str, default=f"{settings.PATH.transcript_path}")
+    parser.add_argument("--max_files", type=int, default=None)
+    parser.add_argument("--batch_size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the cleaning benchmark and print results."""
+    args = arguments()
+    phrases = load_phrases(Path(args.transcript_dir), args.max_files)
+    print(f"Loaded {len(phrases)} utterances from {args.transcript_dir}")
+
+    timings = benchmark_cleaning(phrases, batch_size=args.batch_size, repeat=args.repeat)
+    for name, duration in timings.items():
+        print(f"{name:<15}{duration:>10.3f}s{len(phrases) / max(duration, 1e-9):>15.0f} lines/s")
+    print(f"Speed-up: x{timings['line_by_line'] / max(timings['batch'], 1e-9):.2f} (outputs are identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""On-disk cache of cleaned CHA token streams."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from lm_benchmark import settings
+
+from .extract import extract_from_cha
+
+
+class CHACache:
+    """Persistent cache of the cleaned adult & child words of CHA files.
+
+    Each entry is a compressed ``.npz`` archive holding the vocabulary of one file
+    and its adult/child streams encoded as uint32 token ids.
+    Entries are keyed by file path, modification time & size; a modified file gets a new key,
+    so only changed files are parsed again.
+    """
+
+    # Bump when extraction/cleaning changes, to invalidate existing entries
+    version = 2
+
+    def __init__(self, root: Path | None = None) -> None:
+        if root is None:
+            root = settings.cache_dir() / "childes"
+        root.mkdir(exist_ok=True, parents=True)
+        self.root = root
+
+    @staticmethod
+    def path_key(file: Path) -> str:
+        """Key identifying a CHA file (independent of its version)."""
+        return hashlib.sha1(str(file.resolve()).encode("utf-8"), usedforsecurity=False).hexdigest()
+
+    def entry(self, file: Path) -> Path:
+        """Location of the cache entry matching the current version of the file."""
+        stat = file.stat()
+        return self.root / f"{self.path_key(file)}-{stat.st_mtime_ns}-{stat.st_size}-v{self.version}.npz"
+
+    def load(self, file: Path) -> tuple[list[str], list[str]] | None:
+        """Load cached (adult, child) words of a file, None if the file is not cached."""
+        entry = self.entry(file)
+        if not entry.is_file():
+            return None
+
+        with np.load(entry) as data:
+            vocab = data["vocab"]
+            return vocab[data["adult"]].tolist(), vocab[data["child"]].tolist()
+
+    def save(self, file: Path, adult_words: list[str], child_words: list[str]) -> None:
+        """Store the (adult, child) words of a file, replacing older versions of it."""
+        entry = self.entry(file)
+        for stale in self.root.glob(f"{self.path_key(file)}-*.npz"):
+            stale.unlink(missing_ok=True)
+
+        vocab: dict[str, int] = {}
+        adult = np.fromiter((vocab.setdefault(w, len(vocab)) for w in adult_words), dtype=np.uint32)
+        child = np.fromiter((vocab.setdefault(w, len(vocab)) for w in child_words), dtype=np.uint32)
+
+        # Write to a temporary file first, so that concurrent readers never see partial entries
+        tmp_entry = entry.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_entry.open("wb") as fh:
+            np.savez_compressed(fh, vocab=np.array(list(vocab), dtype=str), adult=adult, child=child)
+        tmp_entry.replace(entry)
+
+    def words(self, file: Path) -> tuple[list[str], list[str]]:
+        """Return the (adult, child) words of a file, parsing it only if not cached."""
+        cached = self.load(file)
+        if cached is not None:
+            return cached
+
+        cha = extract_from_cha(file)
+        adult_words, child_words = cha.adult_tr.raw_words(), cha.child_tr.raw_words()
+        self.save(file, adult_words, child_words)
+        return adult_words, child_words
@@ -4,13 +4,9 @@ import re
 import typing as t
 from pathlib import Path
 
-from ..various import cha_phrase_cleaning
+from lm_benchmark.datasets.utils.various import cha_phrase_cleaning, cha_phrase_cleaning_batch
 
-"""
-TODO(@nhamilakis): write Annotation class/function to extract & clean needed parts
-
-... finish this section
-"""
+from .parser import iter_annotations
 
 AFTER_SEMI = re.compile(r":(?!=)")
 
@@ -27,10 +23,13 @@ class CHATranscriptions:
         line = cha_phrase_cleaning(line)
         self._transcription.append(line)
 
+    def add_annotations(self, lines: list[str]) -> None:
+        """Append a batch of transcription lines."""
+        self._transcription.extend(cha_phrase_cleaning_batch(lines))
+
     def raw_words(self) -> list[str]:
         """Extract raw words."""
-        speech = " ".join(self._transcription)
-        return list(filter(None, speech.split(" ")))
+        return [word for line in self._transcription for word in line.split(" ") if word]
 
     def extract_word_frequency(self) -> collections.Counter:
         """Word frequency of content."""
@@ -45,19 +44,30 @@ class CHAData:
     adult_tr: CHATranscriptions = dataclasses.field(default_factory=lambda: CHATranscriptions(speaker_type="ADULT"))
 
 
+def iter_cha_utterances(file: Path) -> t.Iterator[tuple[str, str]]:
+    """Stream the (speaker, content) pairs of the utterances of a CHA file."""
+    for annotation in iter_annotations(file):
+        if annotation.text:
+            yield annotation.speaker, annotation.text
+
+
 def extract_from_cha(file: Path) -> CHAData:
     """Data extraction from CHA files."""
-    # TODO(@nhamilakis): fix proper parsing
-    # lexer = CHALexer()
-    # parser = CHAParser()
-    # parsed_ast = parser.parse(lexer.tokenize(file.read_text()))
-    # TODO(@nhamilakis): extract wanted data from AST
+    child_lines, adult_lines = [], []
+    for speaker, content in iter_cha_utterances(file):
+        if speaker == "CHI":
+            child_lines.append(content)
+        else:
+            adult_lines.append(content)
 
-    return CHAData()
+    cha_data = CHAData()
+    cha_data.child_tr.add_annotations(child_lines)
+    cha_data.adult_tr.add_annotations(adult_lines)
+    return cha_data
 
 
 def extract_from_cha_dirty(file: Path) -> CHAData:
-    """Quick & dirty parsing for CHA files to extract wanted data."""
+    """Quick & dirty parsing for CHA files to extract wanted data (continuation lines are ignored)."""
 
     def extract_text(_line: str) -> str | None:
         match = AFTER_SEMI.search(_line)
@@ -84,8 +94,30 @@ def extract_from_cha_dirty(file: Path) -> CHAData:
     return cha_data
 
 
-# Temp replacement of parsing
-extract_from_cha: t.Callable[[Path], CHAData] = extract_from_cha_dirty  # type: ignore[no-redef] # noqa: F811
+def count_words_from_cha(
+    file: Path,
+    adult_counts: collections.Counter | None = None,
+    child_counts: collections.Counter | None = None,
+) -> tuple[collections.Counter, collections.Counter]:
+    """Count the cleaned (adult, child) words of a CHA file.
+
+    Counters are updated line by line, only the utterances of the current file are kept in memory
+    (they are cleaned as one batch). If counters are given they are updated in place.
+    """
+    adult_counts = collections.Counter() if adult_counts is None else adult_counts
+    child_counts = collections.Counter() if child_counts is None else child_counts
+
+    speakers, contents = [], []
+    for speaker, content in iter_cha_utterances(file):
+        speakers.append(speaker)
+        contents.append(content)
+
+    for speaker, line in zip(speakers, cha_phrase_cleaning_batch(contents), strict=True):
+        counts = child_counts if speaker == "CHI" else adult_counts
+        counts.update(word for word in line.split(" ") if word)
+
+    return adult_counts, child_counts
+
 
 if __name__ == "__main__":
     _file = Path("data/datasets/Bates/Free20/amy.cha")
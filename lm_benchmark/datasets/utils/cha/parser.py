@@ -1,152 +1,194 @@
-""" File containing CHA file parsing.
-INFO: this file does not pass ruff linting so it has been excluded, because of sly syntax.
-INFO: this file does not pass mypy type-check so it has been excluded, because of sly syntax.
+"""Streaming parser for CHA (CHAT) files.
+
+Files are read line by line & never loaded as a whole:
+
+- header lines (@...) found before the first utterance are parsed into a `CHAHeader`
+- each utterance (*SPK: main tier followed by its %xxx: dependent tiers) is yielded as an `Annotation`
+- continuation lines (starting with a tab) are joined to the tier they continue
 """
+
 import dataclasses
+import re
 import typing as t
 from pathlib import Path
 
-from sly import (
-    Lexer,
-    Parser,
-)
-
-ENCODINGS = {"UTF8"}
+# Age of participants in @ID headers (ex: 2;06.15 -> 2 years 6 months 15 days)
+AGE_PATTERN = re.compile(r"(\d+);(\d+)\.")
 
 
-@dataclasses.dataclass
-class Annotation:
-    speaker: str
-    text: t.AnyStr
-    meta: dict[str, t.AnyStr]
-
-
-@dataclasses.dataclass
-class CHAFileAST:
-    header: dict[str, t.Any]
-    annotations: list[Annotation]
-
-    def filter(self, speaker: str) -> t.Iterator[Annotation]:
-        yield from (x for x in self.annotations if x.speaker == speaker)
-
+def age_in_months(age: str) -> int:
+    """Convert an age string (ex: 2;06.) into a number of months.
 
-class CHALexer(Lexer):
-    """Lexer for CHA files"""
+    Raises
+    ------
+        ValueError if the string does not contain an age
 
-    tokens = {ENCODING, BEGIN, END, HEADER_NAME, ANNOT_NAME, META_NAME, VALUE_STRING}
-    ignore = " \t"
-    literals = {}
+    """
+    match = AGE_PATTERN.search(age)
+    if match:
+        return int(match.group(1)) * 12 + int(match.group(2))
+    raise ValueError(f"Failed to parse '{age}' as an age in months")
 
-    ENCODING = "@UTF8"
-    BEGIN = r"@Begin"
-    END = r"@End"
-    HEADER_NAME = r"@[A-Za-z0-9]+:"
-    ANNOT_NAME = r"\*[A-Za-z0-9]+:"
-    META_NAME = r"%[A-Za-z0-9]+:"
-    VALUE_STRING = r"[^@\*%\n]+"
 
-    @_(r"\n+")  # noqa: sly syntax
-    def newline(self, t):
-        self.lineno += t.value.count("\n")
+@dataclasses.dataclass
+class Participant:
+    """A participant as described by an @ID header.
+
+    @ID: language|corpus|code|age|sex|group|SES|role|education|custom|
+    """
+
+    language: str
+    corpus: str
+    code: str
+    age: str
+    sex: str
+    role: str
+
+    @classmethod
+    def from_id(cls, value: str) -> "Participant":
+        """Build from the value of an @ID header."""
+        fields = [f.strip() for f in value.split("|")]
+        fields.extend([""] * (8 - len(fields)))
+        return cls(
+            language=fields[0],
+            corpus=fields[1],
+            code=fields[2],
+            age=fields[3],
+            sex=fields[4],
+            role=fields[7],
+        )
+
+    @property
+    def months(self) -> int | None:
+        """Age of the participant in months (None if not specified)."""
+        try:
+            return age_in_months(self.age)
+        except ValueError:
+            return None
 
-    @staticmethod
-    def find_column(text, token):
-        last_cr = text.rfind("\n", 0, token.index)
-        if last_cr < 0:
-            last_cr = 0
-        column = (token.index - last_cr) + 1
-        return column
 
-    def error(self, t):
-        print(f"Illegal character {t.value[0]} @ {self.index}:{self.lineno}")
-        self.index += 1
+@dataclasses.dataclass
+class CHAHeader:
+    """Header of a CHA file."""
+
+    fields: dict[str, str] = dataclasses.field(default_factory=dict)
+    participants: dict[str, Participant] = dataclasses.field(default_factory=dict)
+
+    @property
+    def child(self) -> Participant | None:
+        """The target child."""
+        return self.participants.get("CHI")
+
+    def add(self, name: str, value: str) -> None:
+        """Add a header line."""
+        if name == "ID":
+            participant = Participant.from_id(value)
+            self.participants[participant.code] = participant
+        elif name in self.fields:
+            self.fields[name] += f" {value}"
+        else:
+            self.fields[name] = value
 
 
-"""
-statement := HEADER | HEADER_VALUE | TRANSCRIPT | ANNOTATION
-HEADER := NAME
-HEADER_VALUE := NAME ':' VALUE
-TRANSCRIPT := NAME ':' VALUE
-ANNOTATION := NAME ':' VALUE
-NAME := STRING
-NAME := STRING
+@dataclasses.dataclass
+class Annotation:
+    """An utterance: the main tier & its dependent tiers (%mor, %gra, ...)."""
 
-"""
+    speaker: str
+    text: str
+    meta: dict[str, str] = dataclasses.field(default_factory=dict)
+    participant: Participant | None = None
+
+    @property
+    def age(self) -> int | None:
+        """Age of the speaker in months (None if unknown)."""
+        if self.participant is None:
+            return None
+        return self.participant.months
+
+
+def iter_tiers(file: Path) -> t.Iterator[tuple[str, str, str]]:
+    """Stream the tiers of a CHA file as (prefix, name, value), prefix being one of '@', '*', '%'."""
+    current: list[str] | None = None
+
+    def split(tier: list[str]) -> tuple[str, str, str]:
+        line = " ".join(tier)
+        name, _, value = line[1:].partition(":")
+        return line[0], name.strip(), value.strip()
+
+    with file.open(encoding="utf-8-sig") as fh:
+        for raw_line in fh:
+            line = raw_line.rstrip("\r\n")
+            if line.startswith("\t") and current is not None:
+                # Continuation of the current tier
+                current.append(line.strip())
+                continue
+
+            if current is not None:
+                yield split(current)
+            current = [line] if line[:1] in ("@", "*", "%") else None
+
+    if current is not None:
+        yield split(current)
+
+
+def read_header(file: Path) -> CHAHeader:
+    """Parse the header of a CHA file, reading stops at the first utterance."""
+    header = CHAHeader()
+    for prefix, name, value in iter_tiers(file):
+        if prefix == "*":
+            break
+        if prefix == "@":
+            header.add(name, value)
+    return header
+
+
+def iter_annotations(file: Path, header: CHAHeader | None = None) -> t.Iterator[Annotation]:
+    """Stream the annotations of a CHA file.
+
+    If a header is given, it is filled with the header lines found while reading.
+    """
+    header = CHAHeader() if header is None else header
+    current: Annotation | None = None
+
+    for prefix, name, value in iter_tiers(file):
+        if prefix == "%":
+            if current is not None:
+                current.meta[name] = value
+            continue
+
+        # Any other tier closes the current annotation
+        if current is not None:
+            yield current
+            current = None
+
+        if prefix == "*":
+            current = Annotation(speaker=name, text=value, participant=header.participants.get(name))
+        else:
+            header.add(name, value)
 
+    if current is not None:
+        yield current
 
-class CHAParser(Parser):
-    tokens = CHALexer.tokens
-    debugfile = "parser.out"
 
-    def __init__(self):
-        self.parsed_data = CHAFileAST(header={}, annotations=[])
-        self._current_annotation = None
+class CHAReader:
+    """Streaming reader of a CHA file."""
 
-    @_(r"HEADER_NAME VALUE_STRING")
-    def statement(self, line):
-        name = line.HEADER_NAME.replace("@", "").replace(":", "")
-        value = line.VALUE_STRING
+    def __init__(self, file: Path) -> None:
+        self.file = file
+        self._header: CHAHeader | None = None
 
-        if name in self.parsed_data.header:
-            self.parsed_data.header[name] += f" {value}"
-        else:
-            self.parsed_data.header[name] = value
-
-    @_(r"ANNOT_NAME VALUE_STRING")
-    def statement(self, line):
-        name = line.ANNOT_NAME.replace("*", "").replace(":", "")
-        value = line.VALUE_STRING
-
-        if self._current_annotation is not None:
-            self.parsed_data.annotations.append(self._current_annotation)
-            self._current_annotation = None
-
-        self._current_annotation = Annotation(speaker=name, text=value, meta={})
-
-    @_(r"META_NAME VALUE_STRING")
-    def statement(self, line):
-        name = line.META_NAME.replace("%", "").replace(":", "")
-        value = line.VALUE_STRING
-
-        if self._current_annotation is None:
-            raise ValueError("No annotation for meta")
-
-        self._current_annotation.meta[name] = value
-
-    @_(r"ENCODING")
-    def statement(self, line):
-        self.parsed_data.encoding = line.ENCODING.replace("@", "")
-
-    @_(r"BEGIN")
-    def statement(self, line):
-        pass
-
-    @_(r"END")
-    def statement(self, line):
-        pass
-
-    @_(r"HEADER_NAME")
-    def statement(self, line):
-        name = line.HEADER_NAME.replace("@", "").replace(":", "")
-        if name in ENCODINGS:
-            self.parsed_data.header["encoding"] = name
-        print(f"{name}")
-
-    def error(self, p):
-        if p:
-            print("Syntax error at token", p.type)
-            print(p)
-            # Just discard the token and tell the parser it's okay.
-            self.errok()
-        else:
-            print("Syntax error at EOF")
+    @property
+    def header(self) -> CHAHeader:
+        """The header of the file (parsed up to the first utterance)."""
+        if self._header is None:
+            self._header = read_header(self.file)
+        return self._header
 
+    def __iter__(self) -> t.Iterator[Annotation]:
+        """Iterate over annotations."""
+        yield from iter_annotations(self.file)
 
-if __name__ == "__main__":
-    # Testing
-    test_data = Path("~/workspace/coml/data/Lexical-benchmark/data/datasets").expanduser()
-    lexer = CHALexer()
-    parser = CHAParser()
-    cha_text = (test_data / "Bates/Free28/amy28.cha").read_text()
-    tokens = lexer.tokenize(cha_text)
-    result = parser.parse(tokens)
+    def filter(self, speaker: str) -> t.Iterator[Annotation]:
+        """Iterate over the annotations of the given speaker."""
+        yield from (x for x in self if x.speaker == speaker)
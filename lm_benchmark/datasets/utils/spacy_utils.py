@@ -1,13 +1,102 @@
-import spacy
+import functools
+import importlib.metadata
+import json
+import os
+import typing as t
+from pathlib import Path
 
+from lm_benchmark import settings
 
-def spacy_model(model_name: str) -> spacy.Language:
+if t.TYPE_CHECKING:
+    import spacy
+
+# Model used to infer Part of Speech
+POS_MODEL = "en_core_web_sm"
+# Components not needed for coarse PoS tags (token.pos_ is set by the tagger & attribute_ruler)
+POS_UNUSED_PIPES = ("parser", "senter", "ner", "lemmatizer")
+
+
+def spacy_model(model_name: str) -> "spacy.Language":
     """ Safely load spacy Language Model """
+    # spaCy is slow to import, it is only loaded once a model is needed
+    import spacy  # noqa: PLC0415
+
     try:
         return spacy.load(model_name)
     except OSError:
-        from spacy.cli.download import download
+        from spacy.cli.download import download  # noqa: PLC0415 (only needed when the model is missing)
         download(model_name)
 
         return spacy.load(model_name)
 
+
+@functools.cache
+def load_model(model_name: str = POS_MODEL) -> "spacy.Language":
+    """Load a spacy model on first use (once per process)."""
+    return spacy_model(model_name)
+
+
+class POSCache:
+    """Persistent word -> PoS mapping.
+
+    The mapping is stored as a JSON file per model & model version,
+    so upgrading the model invalidates previous tags.
+    """
+
+    def __init__(self, model_name: str = POS_MODEL, root: Path | None = None) -> None:
+        if root is None:
+            root = settings.cache_dir() / "pos"
+        root.mkdir(exist_ok=True, parents=True)
+        self.model_name = model_name
+        self.root = root
+        self._tags: dict[str, str | None] | None = None
+
+    @property
+    def file(self) -> Path:
+        """Location of the cache file."""
+        try:
+            version = importlib.metadata.version(self.model_name)
+        except importlib.metadata.PackageNotFoundError:
+            version = "unknown"
+        return self.root / f"{self.model_name}-{version}.json"
+
+    @property
+    def tags(self) -> dict[str, str | None]:
+        """Cached tags (loaded on first access)."""
+        if self._tags is None:
+            self._tags = json.loads(self.file.read_text()) if self.file.is_file() else {}
+        return self._tags
+
+    def save(self) -> None:
+        """Write the cache to disk."""
+        tmp_file = self.file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(self.tags, ensure_ascii=False))
+        tmp_file.replace(self.file)
+
+
+def words_to_pos(
+    words: t.Iterable[str],
+    *,
+    model_name: str = POS_MODEL,
+    batch_size: int = 512,
+    n_process: int = 1,
+    cache: POSCache | None = None,
+) -> list[str | None]:
+    """Infer the Part of Speech of a list of words (PoS of the first token, None for empty words).
+
+    Unique words missing from the cache are tagged in batches using `nlp.pipe`
+    with all components not required for PoS tagging disabled.
+    """
+    words = list(words)
+    tags = {} if cache is None else cache.tags
+
+    missing = list(dict.fromkeys(w for w in words if w not in tags))
+    if missing:
+        nlp = load_model(model_name)
+        disable = [name for name in POS_UNUSED_PIPES if name in nlp.pipe_names]
+        docs = nlp.pipe(missing, batch_size=batch_size, n_process=n_process, disable=disable)
+        tags.update({word: doc[0].pos_ if len(doc) > 0 else None for word, doc in zip(missing, docs, strict=True)})
+        if cache is not None:
+            cache.save()
+
+    return [tags[w] for w in words]
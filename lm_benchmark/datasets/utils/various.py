@@ -1,7 +1,10 @@
-import typing as t
 import re
 import string
-from .spacy_utils import spacy_model
+import typing as t
+
+import pandas as pd
+
+from .spacy_utils import load_model
 
 # Translator Cleaner
 tr_cleaner = str.maketrans('', '', string.punctuation + string.digits)
@@ -14,10 +17,22 @@ BRACKET_TEXT = re.compile(r"\[.*?\]")
 CHA_ANNOT = re.compile(r"[&=]+\s*\w+")
 # Match CHA filler descriptions
 CHA_NOISE = re.compile(r"(xxx)|(trn)|(sr)|(yyy)|(noise)")
-
-# PoS Infer Model
-pos_model = spacy_model('en_core_web_sm')
-
+# Regex matching all text between parenthesis (non-greedily)
+PAREN_TEXT = re.compile(r"\(.*?\)")
+
+# Batch cleaning joins phrases with new-lines, the expressions below never match across them
+# Same as CHA_ANNOT, without new-lines in the whitespace
+_BATCH_CHA_ANNOT = re.compile(r"[&=]+[^\S\n]*\w+")
+# Same as CHA_NOISE, without the (useless) capture groups
+_BATCH_CHA_NOISE = re.compile(r"xxx|trn|sr|yyy|noise")
+# Same as only_chars_r, keeping new-lines
+_BATCH_ONLY_CHARS = re.compile(r"[^\w \n]+")
+# Runs of non-ascii characters
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+# Byte-level tables: tr_cleaner deletions, then ascii lower-casing & deletion of all other non-word ascii bytes
+_ASCII_PUNCT = (string.punctuation + string.digits).encode("ascii")
+_ASCII_LOWER = bytes.maketrans(string.ascii_uppercase.encode("ascii"), string.ascii_lowercase.encode("ascii"))
+_ASCII_NON_WORD = bytes(i for i in range(128) if chr(i) not in string.ascii_letters + " \n")
 
 def cha_phrase_cleaning(phrase: str) -> str:
     try:
@@ -33,6 +48,39 @@ def cha_phrase_cleaning(phrase: str) -> str:
     except:
         return str(phrase)
 
+def cha_phrase_cleaning_batch(phrases: t.Sequence[str]) -> list[str]:
+    """Clean a batch of CHA phrases, output is identical to `cha_phrase_cleaning` applied on each of them.
+
+    Phrases are joined by new-lines and every cleaning step runs once on the whole batch.
+    Punctuation removal & lower-casing run on bytes for the ascii characters; `str.lower` is applied
+    only to non-ascii runs (it is a per-character mapping, except for the final sigma).
+    """
+    # Items that can not be joined safely are cleaned one by one
+    fallback = {i: cha_phrase_cleaning(p) for i, p in enumerate(phrases) if not isinstance(p, str) or "\n" in p}
+    if len(fallback) == len(phrases):
+        return [fallback[i] for i in range(len(phrases))]
+
+    text = "\n".join(p for i, p in enumerate(phrases) if i not in fallback)
+    text = BRACKET_TEXT.sub("", text)
+    text = _BATCH_CHA_ANNOT.sub("", text)
+    text = _BATCH_CHA_NOISE.sub("", text)
+    # word_cleaning steps
+    text = PAREN_TEXT.sub("", text)
+    data = text.encode("utf-8", "surrogatepass")
+    if "\u03a3" in text:
+        # Capital sigma lower-casing depends on its neighbours: keep the original order of steps
+        text = data.translate(None, _ASCII_PUNCT).decode("utf-8", "surrogatepass").lower()
+        text = _BATCH_ONLY_CHARS.sub("", text)
+    else:
+        text = data.translate(_ASCII_LOWER, _ASCII_NON_WORD).decode("utf-8", "surrogatepass")
+        if not text.isascii():
+            text = _NON_ASCII.sub(lambda m: _BATCH_ONLY_CHARS.sub("", m.group().lower()), text)
+
+    # Only words & spaces remain: stripping lines is removing spaces
+    cleaned = iter([line.strip(" ") for line in text.split("\n")])
+    return [fallback[i] if i in fallback else next(cleaned) for i in range(len(phrases))]
+
+
 def word_cleaning(word: str) -> str:
     """ Clean-up text by keeping only wordlike items.
 
@@ -43,14 +91,14 @@ def word_cleaning(word: str) -> str:
     - TODO: remove annotations; problem: polysemies
     - TODO: do we have expressions ? if yes we need to not eliminate spaces in the regexp
     """
-    word = re.sub(r"\(.*?\)", "", word)
+    word = PAREN_TEXT.sub("", word)
     clean_string = word.translate(tr_cleaner).lower()
     return only_chars_r.sub("", clean_string).strip()
 
 
 def word_to_pos(word) -> t.Optional[str]:
-    """ Infer Part of Speech from a given word """
-    doc = pos_model(word)
+    """ Infer Part of Speech from a given word (see spacy_utils.words_to_pos for lists of words) """
+    doc = load_model()(word)
     first_token = next(iter(doc), None)
     if first_token:
         return first_token.pos_
@@ -66,17 +114,16 @@ def remove_exp(df,header:str):
     """remove expressions with more than one word"""
     return df[~df[header].str.contains(r"\s", regex=True)]
 
-def merge_word(df,header:str):
-    """merge same word in different semantic senses"""
-    merged_df = df.groupby(header).first().reset_index()
-    # Aggregate other columns
-    for col in df.columns:
-        if col != header:
-            if df[col].dtype == 'object':
-                merged_df[col] = df.groupby(header)[col].first().reset_index()[col]
-            else:
-                merged_df[col] = df.groupby(header)[col].sum().reset_index()[col]
-    return merged_df
-
+def merge_word(df: pd.DataFrame, header: str) -> pd.DataFrame:
+    """merge same word in different semantic senses
 
+    Numeric columns (ex: month scores) are summed, other columns keep their first value.
+    Each block of columns is aggregated in a single pass over the groups.
+    """
+    columns = [col for col in df.columns if col != header]
+    numeric = [col for col in columns if pd.api.types.is_numeric_dtype(df[col])]
+    others = [col for col in columns if col not in set(numeric)]
 
+    grouped = df.groupby(header)
+    merged_df = pd.concat([grouped[numeric].sum(), grouped[others].first()], axis=1)
+    return merged_df[columns].reset_index()
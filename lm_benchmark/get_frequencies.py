@@ -5,21 +5,48 @@ import pandas as pd
 
 from lm_benchmark import nlp_tools, settings
 from lm_benchmark.analysis import frequency_utils
+from lm_benchmark.datasets.machine_cdi.token_corpus import TokenCorpus, is_token_corpus
+from lm_benchmark.storage import read_table, write_table
 
 
-def arguments() -> argparse.Namespace:
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
     """Build & Parse command-line arguments."""
     parser = argparse.ArgumentParser()
-    parser.add_argument("--src_file", default=f"{settings.PATH.DATA_DIR / 'datasets/raw/train/3200.csv'}")
+    parser.add_argument(
+        "--src_file",
+        default=f"{settings.PATH.DATA_DIR / 'datasets/raw/train/3200.csv'}",
+        help="text/csv corpus, or the token corpus of a train split (ex: EN/50h/00/tokens)",
+    )
     parser.add_argument("--target_file", default=f"{settings.PATH.DATA_DIR / 'datasets/processed/freq/3200_3gram.csv'}")
     parser.add_argument("--header", default="train")
-    parser.add_argument("--ngram", default=3)
-    return parser.parse_args()
+    parser.add_argument("--ngram", type=int, default=3)
+    parser.add_argument(
+        "--max_tokens", type=int, default=None, help="Only count the first lines within this number of tokens"
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> None:
+def corpus_frequencies(corpus: TokenCorpus, ngram: int, max_tokens: int | None = None) -> pd.DataFrame:
+    """Count the (n-gram) frequencies of a token corpus, on its token ids (no text is parsed).
+
+    With a token budget, only the first lines whose total number of tokens is within the budget are counted.
+
+    Raises
+    ------
+        ValueError if the ngram number is not positive
+
+    """
+    if ngram < 1:
+        raise ValueError(f"The ngram number should be an integer and above 0, got {ngram}")
+    stop = len(corpus) if max_tokens is None else corpus.chunker().fit(max_tokens)
+    if ngram == 1:
+        return nlp_tools.TokenCount(corpus.counter(0, stop)).df
+    return corpus.ngram_counts(ngram, 0, stop)
+
+
+def main(argv: list[str] | None = None) -> None:
     """Run the GoldReference loader and write results to a file."""
-    args = arguments()
+    args = arguments(argv)
 
     target = Path(args.target_file)
     src_file = args.src_file
@@ -27,19 +54,27 @@ def main() -> None:
     ngram = args.ngram
     print(f"Loading text from {src_file}")
 
-    if ngram == 1:
+    if is_token_corpus(Path(src_file)):
+        count_df = corpus_frequencies(TokenCorpus(Path(src_file)), ngram, args.max_tokens)
+        write_table(count_df, target)
+        print(f"Writing freq file to {target}")
+    elif args.max_tokens is not None:
+        raise ValueError("A token budget (--max_tokens) requires a token corpus as source !!")
+    elif ngram == 1:
         if src_file.endswith("txt"):
             token_count = nlp_tools.TokenCount.from_text_file(src_file)
-        elif src_file.endswith("csv"):
-            token_count = nlp_tools.TokenCount.from_df(src_file, header)
-        token_count.df.to_csv(target, index=False)
+        else:
+            token_count = nlp_tools.TokenCount.from_df(read_table(src_file, columns=[header]), header)
+        write_table(token_count.df, target)
         print(f"Writing freq file to {target}")
     elif ngram > 1:
         if src_file.endswith("txt"):
             header = 0  # load the text file as csv directly
-        sentences = pd.read_csv(src_file)[header].tolist()
+            sentences = pd.read_csv(src_file)[header].tolist()
+        else:
+            sentences = read_table(src_file, columns=[header])[header].tolist()
         count_df = frequency_utils.count_ngrams(sentences, ngram)
-        count_df.to_csv(target, index=False)
+        write_table(count_df, target)
         print(f"Writing freq file to {target}")
     else:
         print("The ngram number should be an integer and above 0!")
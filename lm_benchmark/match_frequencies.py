@@ -8,9 +8,10 @@ import pandas as pd
 
 from lm_benchmark import settings
 from lm_benchmark.analysis import frequency_utils
+from lm_benchmark.storage import TABLE_SUFFIXES, read_table, write_table
 
 
-def arguments() -> argparse.Namespace:
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
     """Build & Parse command-line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--CDI_path", default=f"{settings.PATH.DATA_DIR / 'datasets/processed/CDI/'}")
@@ -22,13 +23,17 @@ def arguments() -> argparse.Namespace:
     parser.add_argument("--test_type", type=str, default="exp")
     parser.add_argument("--sampling_ratio", type=int, default=1)
     parser.add_argument("--nbins", type=int, default=6)
-    return parser.parse_args()
+    parser.add_argument("--table_format", choices=list(TABLE_SUFFIXES), default="csv", help="Format of the CDI files")
+    parser.add_argument(
+        "--annotated_file", default=None, help="Where to write the frequency-annotated CDI (default: overwrite it)"
+    )
+    return parser.parse_args(argv)
 
 
 def annotate_freq(cdi_file: Path, human_freq: Path) -> pd.DataFrame:
     """Annotate Frequencies."""
-    cdi_data = pd.read_csv(cdi_file)
-    human_freq_data = pd.read_csv(human_freq)
+    cdi_data = read_table(cdi_file)
+    human_freq_data = read_table(human_freq)
     merged_df = cdi_data.merge(human_freq_data, on="word", how="left")
     merged_df.dropna()
     return merged_df
@@ -80,27 +85,28 @@ def match_sample(
     return pidx, lbest, stat
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     """Run the GoldReference loader and write results to a file."""
-    args = arguments()
+    args = arguments(argv)
     lang = args.lang
 
     machine_freq_file = Path(args.machine_freq)
-    cdi_file = Path(args.CDI_path) / f"{lang}_{args.test_type}_human.csv"
-    cdi_stat_file = Path(args.CDI_path) / f"{lang}_{args.test_type}_stat.csv"
+    suffix = TABLE_SUFFIXES[args.table_format]
+    cdi_file = Path(args.CDI_path) / f"{lang}_{args.test_type}_human{suffix}"
+    cdi_stat_file = Path(args.CDI_path) / f"{lang}_{args.test_type}_stat{suffix}"
     human_freq_file = Path(args.human_freq)
-    machine_cdi_file = Path(args.CDI_path) / f"{lang}_{args.test_type}_machine.csv"
+    machine_cdi_file = Path(args.CDI_path) / f"{lang}_{args.test_type}_machine{suffix}"
 
     # match human-CDI and CHILDES
     target = annotate_freq(cdi_file, human_freq_file)
-    machine_freq = pd.read_csv(str(machine_freq_file))
-    target.to_csv(cdi_file)
+    machine_freq = read_table(machine_freq_file)
+    write_table(target, cdi_file if args.annotated_file is None else Path(args.annotated_file), index=True)
     # match files
     pidx, _, stat = match_sample(target, machine_freq, args.sampling_ratio, args.nbins)
     # save the files
 
-    machine_freq.iloc[pidx].to_csv(machine_cdi_file)
-    stat.to_csv(cdi_stat_file)
+    write_table(machine_freq.iloc[pidx], machine_cdi_file, index=True)
+    write_table(stat, cdi_stat_file, index=True)
 
 
 if __name__ == "__main__":
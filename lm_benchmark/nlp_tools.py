@@ -18,6 +18,7 @@ except ImportError:
     enchant = None
 
 from lm_benchmark import settings, utils
+from lm_benchmark.storage import iter_table_chunks
 
 WORD_PATTERN = re.compile(r"\b\w+\b")
 # Manual extra word list
@@ -196,9 +197,11 @@ class TokenCount:
 
     @classmethod
     def from_csv(cls, file_path: Path, header: str = "word") -> "TokenCount":
-        """Load from CSV file."""
-        count_csv = pd.read_csv(file_path)
-        return cls.from_df(count_csv, header=header)
+        """Load from CSV (or Parquet/Feather) file, only the header column is read (in chunks)."""
+        words_counter: Counter = Counter()
+        for chunk in iter_table_chunks(file_path, [header], dtype={header: str}):
+            words_counter.update(w for w in chunk[header].dropna().astype(str) if WORD_PATTERN.match(w))
+        return cls(words_counter, header)
 
     @classmethod
     def from_text_file(cls, file_path: Path | str) -> "TokenCount":
@@ -0,0 +1,4 @@
+from .artifacts import ArtifactStore
+from .stage import Stage
+
+__all__ = ["ArtifactStore", "Stage"]
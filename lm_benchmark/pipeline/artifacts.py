@@ -0,0 +1,148 @@
+"""Content-addressed store of pipeline artifacts."""
+
+import hashlib
+import json
+import os
+import shutil
+import typing as t
+from pathlib import Path
+
+from lm_benchmark import settings
+from lm_benchmark.utils import file_digest
+
+
+def copy_path(src: Path, target: Path) -> None:
+    """Copy a file or a directory (replacing the target)."""
+    if target.is_dir():
+        shutil.rmtree(target)
+    target.parent.mkdir(exist_ok=True, parents=True)
+    if src.is_dir():
+        shutil.copytree(src, target)
+    else:
+        shutil.copy2(src, target)
+
+
+def remove_path(path: Path) -> None:
+    """Remove a file or a directory (if it exists)."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+class ArtifactStore:
+    """Outputs of pipeline stages, addressed by a hash of the stage, its parameters & the content of its inputs.
+
+    root/
+        digests.json            : digests of the files already hashed (path -> mtime_ns, size, sha256)
+        <key>/manifest.json     : stage, parameters & input digests that produced the artifacts
+        <key>/<i>-<name>        : copy of the i-th output (file or directory)
+
+    A change in any input or parameter yields a new key, so stale artifacts are never reused;
+    unchanged upstream outputs keep the same content, so their dependents are not recomputed.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        if root is None:
+            root = settings.cache_dir() / "artifacts"
+        root.mkdir(exist_ok=True, parents=True)
+        self.root = root
+        self._digests_file = root / "digests.json"
+        self._digests: dict[str, list] = (
+            json.loads(self._digests_file.read_text()) if self._digests_file.is_file() else {}
+        )
+
+    def file_digest(self, file: Path) -> str:
+        """Digest of the content of a file (only re-hashed when its mtime or size changes)."""
+        stat = file.stat()
+        name = str(file.resolve())
+        cached = self._digests.get(name)
+        if cached is not None and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return cached[2]
+
+        digest = file_digest(file)
+        self._digests[name] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def digest(self, path: Path) -> str:
+        """Digest of the content of a file or a directory (relative paths & digests of all its files).
+
+        Raises
+        ------
+            ValueError if the path does not exist
+
+        """
+        if path.is_file():
+            return self.file_digest(path)
+        if not path.is_dir():
+            raise ValueError(f"Given path ::{path}:: does not exist !!")
+
+        h = hashlib.sha256()
+        for file in sorted(p for p in path.rglob("*") if p.is_file()):
+            h.update(f"{file.relative_to(path).as_posix()}\t{self.file_digest(file)}\n".encode())
+        return h.hexdigest()
+
+    def key(self, name: str, params: dict[str, t.Any], inputs: t.Iterable[Path]) -> tuple[str, dict]:
+        """Compute the key of a stage run.
+
+        Returns
+        -------
+            the key & the manifest describing the run
+
+        """
+        manifest = {
+            "stage": name,
+            # Paths (& other non JSON values) are recorded as strings
+            "params": json.loads(json.dumps(params, sort_keys=True, default=str)),
+            "inputs": {str(path): self.digest(path) for path in inputs},
+        }
+        self.flush()
+        return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest(), manifest
+
+    def entry(self, key: str) -> Path:
+        """Location of the artifacts of a key."""
+        return self.root / key
+
+    def has(self, key: str) -> bool:
+        """Whether artifacts are stored under the key."""
+        return (self.entry(key) / "manifest.json").is_file()
+
+    def save(self, key: str, manifest: dict, outputs: list[Path]) -> None:
+        """Store a copy of the outputs of a run.
+
+        Raises
+        ------
+            ValueError if an output was not created
+
+        """
+        for path in outputs:
+            if not path.exists():
+                raise ValueError(f"Output ::{path}:: of stage {manifest['stage']} was not created !!")
+
+        # Build the entry in a temporary directory, so that a partial entry is never visible
+        tmp_entry = self.root / f"{key}.{os.getpid()}.tmp"
+        remove_path(tmp_entry)
+        for i, path in enumerate(outputs):
+            copy_path(path, tmp_entry / f"{i}-{path.name}")
+        manifest = {**manifest, "outputs": [str(p) for p in outputs]}
+        (tmp_entry / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+        try:
+            tmp_entry.rename(self.entry(key))
+        except OSError:
+            # Another process stored the same artifacts first
+            remove_path(tmp_entry)
+
+    def restore(self, key: str, outputs: list[Path]) -> None:
+        """Copy stored artifacts to the output locations (only missing or modified outputs are copied)."""
+        for i, path in enumerate(outputs):
+            stored = self.entry(key) / f"{i}-{path.name}"
+            if not path.exists() or self.digest(path) != self.digest(stored):
+                copy_path(stored, path)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the digests to disk."""
+        tmp_file = self._digests_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(self._digests))
+        tmp_file.replace(self._digests_file)
@@ -0,0 +1,298 @@
+"""Run the whole benchmark from a TOML description.
+
+usage: run-benchmark benchmark.toml [--n_jobs N] [--force] [--dry_run]
+
+Example of description (all keys are optional, defaults are shown):
+
+    [benchmark]
+    langs = ["AE", "BE"]                    # keys of settings.AGE_DICT
+    test_types = ["exp"]                    # CDI forms
+    hours = ["50h", ..., "7100h"]           # keys of settings.model_dict, frequencies of each training set
+    machine_hours = "3200h"                 # training set the machine CDI is matched against
+    generations = ["unprompted_LSTM_2.csv"] # generation files (datasets/processed/generation/)
+    prompt_type = "unprompted"
+    temperatures = [0.3, 0.6, 1.0, 1.5]
+    thresholds = [1]                        # count thresholds used for scoring
+    ngram = 1
+    sampling_ratio = 1
+    nbins = 6
+    table_format = "csv"                    # format of the processed tables: csv, parquet or feather
+
+    [paths]
+    data_dir = "data/"                      # default: settings.PATH.DATA_DIR
+    human_freq = "datasets/processed/freq/CHILDES_adult.csv"
+
+Stages are linked through their files: a stage depends on the stages producing its inputs,
+and stages writing the same outputs run one after the other.
+Independent stages run concurrently in a process pool; outputs are stored in the artifact store,
+so running the same description again (ex: after a failure) only runs the stages that did not complete
+or whose inputs changed.
+"""
+
+import argparse
+import dataclasses
+import tomllib
+import typing as t
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from lm_benchmark import settings
+from lm_benchmark.storage import TABLE_SUFFIXES
+
+from . import stages
+from .artifacts import ArtifactStore
+from .stage import Stage
+
+
+@dataclasses.dataclass
+class BenchmarkConfig:
+    """Description of a benchmark run."""
+
+    langs: list[str] = dataclasses.field(default_factory=lambda: list(settings.AGE_DICT))
+    test_types: list[str] = dataclasses.field(default_factory=lambda: ["exp"])
+    hours: list[str] = dataclasses.field(default_factory=lambda: list(settings.model_dict))
+    machine_hours: str = "3200h"
+    generations: list[str] = dataclasses.field(default_factory=lambda: ["unprompted_LSTM_2.csv"])
+    prompt_type: str = "unprompted"
+    temperatures: list[float] = dataclasses.field(default_factory=lambda: [0.3, 0.6, 1.0, 1.5])
+    thresholds: list[float] = dataclasses.field(default_factory=lambda: [1])
+    ngram: int = 1
+    sampling_ratio: int = 1
+    nbins: int = 6
+    table_format: str = "csv"
+    data_dir: Path = dataclasses.field(default_factory=lambda: settings.PATH.DATA_DIR)
+    human_freq: str = "datasets/processed/freq/CHILDES_adult.csv"
+
+    @classmethod
+    def load(cls, file: Path) -> "BenchmarkConfig":
+        """Load from a TOML file.
+
+        Raises
+        ------
+            ValueError if the file contains unknown keys or an unknown table format
+
+        """
+        with file.open("rb") as fh:
+            data = tomllib.load(fh)
+        values = {**data.get("benchmark", {}), **data.get("paths", {})}
+
+        known = {f.name for f in dataclasses.fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Unknown keys in {file}: {', '.join(sorted(unknown))}")
+        fmt = values.get("table_format", "csv")
+        if fmt not in TABLE_SUFFIXES:
+            raise ValueError(f"Unknown table format ::{fmt}::, expected one of {', '.join(TABLE_SUFFIXES)}")
+        if "data_dir" in values:
+            values["data_dir"] = Path(values["data_dir"])
+        return cls(**values)
+
+    def build_stages(self) -> list[Stage]:
+        """Build the stages of the benchmark."""
+        datasets = self.data_dir / "datasets"
+        cdi_dir = datasets / "processed/CDI"
+        freq_dir = datasets / "processed/freq"
+        month_count_dir = datasets / "processed/month_count"
+        # suffix of the processed tables (raw inputs & the human frequencies are read as given)
+        suffix = TABLE_SUFFIXES[self.table_format]
+
+        # frequencies of each training set
+        result = [
+            stages.get_frequencies(
+                datasets / f"raw/train/{hours.removesuffix('h')}.csv", freq_dir / f"{hours}{suffix}", ngram=self.ngram
+            )
+            for hours in self.hours
+        ]
+        # human CDI & the matching machine CDI
+        for lang in self.langs:
+            for test_type in self.test_types:
+                result.append(
+                    stages.build_human_cdi(lang, test_type, datasets / "raw", cdi_dir, table_format=self.table_format)
+                )
+                result.append(
+                    stages.match_frequencies(
+                        lang,
+                        test_type,
+                        cdi_dir,
+                        human_freq=self.data_dir / self.human_freq,
+                        machine_freq=freq_dir / f"{self.machine_hours}{suffix}",
+                        sampling_ratio=self.sampling_ratio,
+                        nbins=self.nbins,
+                        table_format=self.table_format,
+                    )
+                )
+        # monthly counts of the generations & their scores
+        headers = [f"{self.prompt_type}_{temperature}" for temperature in self.temperatures]
+        for generation in self.generations:
+            gen_file = datasets / "processed/generation" / generation
+            model = gen_file.stem.split("_")[1]
+            for lang in self.langs:
+                result.append(
+                    stages.adjust_count(
+                        gen_file,
+                        lang,
+                        headers,
+                        est_file=datasets / "raw/vocal_month.csv",
+                        cdi_dir=cdi_dir,
+                        freq_path=month_count_dir,
+                        prompt_type=self.prompt_type,
+                        table_format=self.table_format,
+                    )
+                )
+                result.extend(
+                    stages.score_counts(
+                        month_count_dir / self.prompt_type / model / lang,
+                        datasets / f"processed/score/{lang}_{self.prompt_type}_{model}_{threshold}{suffix}",
+                        threshold=threshold,
+                    )
+                    for threshold in self.thresholds
+                )
+        return result
+
+
+def overlaps(path: Path, other: Path) -> bool:
+    """Whether one path is, or contains, the other."""
+    return path == other or path in other.parents or other in path.parents
+
+
+def dependency_graph(pipeline: list[Stage]) -> dict[str, set[str]]:
+    """Dependencies of each stage (by name).
+
+    Raises
+    ------
+        ValueError if two stages have the same name
+
+    """
+    names = [stage.name for stage in pipeline]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique !!")
+
+    deps: dict[str, set[str]] = {stage.name: set() for stage in pipeline}
+    for i, stage in enumerate(pipeline):
+        for j, other in enumerate(pipeline):
+            if i == j:
+                continue
+            # other produces one of the inputs of stage
+            produces = any(overlaps(src, out) for src in stage.inputs for out in other.outputs)
+            # both write the same outputs, they run in declaration order
+            shares = j < i and any(overlaps(out, o) for out in stage.outputs for o in other.outputs)
+            if produces or shares:
+                deps[stage.name].add(other.name)
+    return deps
+
+
+def run_stage(stage: Stage, store_root: Path, *, force: bool) -> bool:
+    """Run a stage in a worker process."""
+    return stage.run(ArtifactStore(store_root), force=force)
+
+
+def propagate_skips(deps: dict[str, set[str]], status: dict[str, str]) -> None:
+    """Mark the stages depending (even indirectly) on a failed or skipped stage as skipped.
+
+    Stages are checked until no status changes, so the declaration order of the stages does not matter.
+    """
+    changed = True
+    while changed:
+        changed = False
+        for name, stage_deps in deps.items():
+            if name not in status and any(status.get(d) in ("failed", "skipped") for d in stage_deps):
+                status[name] = "skipped"
+                print(f"[skipped] {name}: a dependency failed")
+                changed = True
+
+
+def ready_stages(deps: dict[str, set[str]], status: dict[str, str], running: t.Collection[str]) -> list[str]:
+    """Stages not started yet whose dependencies all completed."""
+    return [
+        name
+        for name, stage_deps in deps.items()
+        if name not in status and name not in running and all(status.get(d) in ("run", "cached") for d in stage_deps)
+    ]
+
+
+def record_results(done: t.Iterable[Future], running: dict[Future, str], status: dict[str, str]) -> None:
+    """Record the status of finished stages."""
+    for future in done:
+        name = running.pop(future)
+        try:
+            status[name] = "run" if future.result() else "cached"
+        except Exception as e:  # noqa: BLE001
+            status[name] = "failed"
+            print(f"[failed] {name}: {e!r}")
+        else:
+            print(f"[{status[name]}] {name}")
+
+
+def run_pipeline(
+    pipeline: list[Stage],
+    store: ArtifactStore,
+    n_jobs: int | None = None,
+    *,
+    force: bool = False,
+) -> dict[str, str]:
+    """Run the stages of a pipeline, independent stages concurrently.
+
+    A failed stage does not stop the others, only the stages depending on it are skipped.
+
+    Returns
+    -------
+        the status of each stage: 'run', 'cached', 'failed' or 'skipped'
+
+    Raises
+    ------
+        ValueError if stages depend on each other circularly
+
+    """
+    by_name = {stage.name: stage for stage in pipeline}
+    deps = dependency_graph(pipeline)
+    status: dict[str, str] = {}
+    running: dict[Future, str] = {}
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        while True:
+            propagate_skips(deps, status)
+            if len(status) == len(pipeline):
+                return status
+
+            for name in ready_stages(deps, status, running.values()):
+                running[executor.submit(run_stage, by_name[name], store.root, force=force)] = name
+            if not running:
+                # nothing runs, nothing can start & no stage is left to skip
+                remaining = ", ".join(sorted(set(deps) - set(status)))
+                raise ValueError(f"Circular dependencies between stages: {remaining}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            record_results(done, running, status)
+
+
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Build & Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Run the benchmark described in a TOML file")
+    parser.add_argument("config", type=str, help="TOML description of the benchmark")
+    parser.add_argument("--n_jobs", type=int, default=None, help="Number of stages run concurrently")
+    parser.add_argument("--store_dir", type=str, default=None, help="Artifact store (default: in the cache dir)")
+    parser.add_argument("--force", action="store_true", help="Run all stages, ignoring stored artifacts")
+    parser.add_argument("--dry_run", action="store_true", help="Only print the stages & their dependencies")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark."""
+    args = arguments(argv)
+    pipeline = BenchmarkConfig.load(Path(args.config)).build_stages()
+
+    if args.dry_run:
+        for name, stage_deps in dependency_graph(pipeline).items():
+            print(f"{name} <- {', '.join(sorted(stage_deps)) or '-'}")
+        return
+
+    store = ArtifactStore(None if args.store_dir is None else Path(args.store_dir))
+    status = run_pipeline(pipeline, store, n_jobs=args.n_jobs, force=args.force)
+    failed = [name for name, value in status.items() if value in ("failed", "skipped")]
+    if failed:
+        raise SystemExit(f"{len(failed)} stage(s) did not complete, run again to resume: {', '.join(failed)}")
+    print("Finished running the benchmark!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Pipeline stages: a CLI of the benchmark with declared inputs & outputs."""
+
+import dataclasses
+import importlib
+import typing as t
+from pathlib import Path
+
+from .artifacts import ArtifactStore, remove_path
+
+
+@dataclasses.dataclass
+class Stage:
+    """A step of the benchmark.
+
+    The stage runs `command.main(argv)`, argv being built from `args` (--name value).
+    `inputs` are the files/directories read by the command, `outputs` the ones it creates;
+    the outputs are cached under a key derived from the command, its arguments & the content of its inputs.
+    """
+
+    name: str
+    command: str
+    args: dict[str, t.Any]
+    inputs: list[Path]
+    outputs: list[Path]
+
+    def argv(self) -> list[str]:
+        """Command-line arguments of the command."""
+        argv = []
+        for name, value in self.args.items():
+            if value is None:
+                continue
+            values = value if isinstance(value, list | tuple) else [value]
+            argv.extend([f"--{name}", *(str(v) for v in values)])
+        return argv
+
+    def execute(self) -> None:
+        """Run the command."""
+        importlib.import_module(self.command).main(self.argv())
+
+    def run(self, store: ArtifactStore | None = None, *, force: bool = False) -> bool:
+        """Run the stage, unless its outputs are in the store (they are then restored).
+
+        Returns
+        -------
+            True if the command was executed, False if the outputs were restored from the store
+
+        """
+        if store is None:
+            self.execute()
+            return True
+
+        key, manifest = store.key(self.command, self.args, self.inputs)
+        if not force and store.has(key):
+            store.restore(key, self.outputs)
+            return False
+
+        # Stale outputs are removed, commands reusing existing files would otherwise pick them up
+        for path in self.outputs:
+            remove_path(path)
+        self.execute()
+        store.save(key, manifest, self.outputs)
+        return True
@@ -0,0 +1,190 @@
+"""Stage declarations of the benchmark CLIs (same defaults as the command-line)."""
+
+from pathlib import Path
+
+from lm_benchmark import settings
+from lm_benchmark.storage import TABLE_SUFFIXES
+
+from .stage import Stage
+
+
+def get_frequencies(src_file: Path, target_file: Path, header: str = "train", ngram: int = 3) -> Stage:
+    """Count the (n-gram) frequencies of a text/csv corpus."""
+    return Stage(
+        name=f"get_frequencies:{target_file.stem}",
+        command="lm_benchmark.get_frequencies",
+        args={"src_file": src_file, "target_file": target_file, "header": header, "ngram": ngram},
+        inputs=[src_file],
+        outputs=[target_file],
+    )
+
+
+def build_human_cdi(
+    lang: str,
+    test_type: str,
+    src_dir: Path,
+    target_dir: Path,
+    filter_by_word_type: str = "content",
+    table_format: str = "csv",
+) -> Stage:
+    """Build the gold human CDI of a language & test type."""
+    suffix = TABLE_SUFFIXES[table_format]
+    return Stage(
+        name=f"build_human_cdi:{lang}_{test_type}",
+        command="lm_benchmark.build_human_cdi",
+        args={
+            "lang": lang,
+            "test_type": test_type,
+            "src_file": src_dir,
+            "target_file": target_dir,
+            "filter-by-word-type": filter_by_word_type,
+            "table_format": table_format,
+        },
+        inputs=[src_dir / f"{lang}_{test_type}.csv"],
+        outputs=[target_dir / f"{lang}_{test_type}_human{suffix}"],
+    )
+
+
+def match_frequencies(
+    lang: str,
+    test_type: str,
+    cdi_dir: Path,
+    human_freq: Path,
+    machine_freq: Path,
+    sampling_ratio: int = 1,
+    nbins: int = 6,
+    table_format: str = "csv",
+) -> Stage:
+    """Select the machine CDI matching the frequencies of the human CDI.
+
+    The annotated human CDI is written to a separate file, so that the human CDI (an input) is left untouched.
+    """
+    suffix = TABLE_SUFFIXES[table_format]
+    annotated_file = cdi_dir / f"{lang}_{test_type}_human_freq{suffix}"
+    return Stage(
+        name=f"match_frequencies:{lang}_{test_type}",
+        command="lm_benchmark.match_frequencies",
+        args={
+            "CDI_path": cdi_dir,
+            "human_freq": human_freq,
+            "machine_freq": machine_freq,
+            "lang": lang,
+            "test_type": test_type,
+            "sampling_ratio": sampling_ratio,
+            "nbins": nbins,
+            "table_format": table_format,
+            "annotated_file": annotated_file,
+        },
+        inputs=[cdi_dir / f"{lang}_{test_type}_human{suffix}", human_freq, machine_freq],
+        outputs=[
+            cdi_dir / f"{lang}_{test_type}_machine{suffix}",
+            cdi_dir / f"{lang}_{test_type}_stat{suffix}",
+            annotated_file,
+        ],
+    )
+
+
+def adjust_count(
+    gen_file: Path,
+    lang: str,
+    header_lst: list[str],
+    est_file: Path = settings.PATH.DATA_DIR / "datasets/raw/vocal_month.csv",
+    cdi_dir: Path = settings.PATH.DATA_DIR / "datasets/processed/CDI/",
+    freq_path: Path = settings.PATH.DATA_DIR / "datasets/processed/month_count/",
+    prompt_type: str = "unprompted",
+    test_set: str = "machine",
+    table_format: str = "csv",
+    *,
+    count: bool = False,
+) -> Stage:
+    """Accumulate the monthly counts of a generation file (one count file per header).
+
+    The counts of all words (freq_path/prompt_type/model/<header>.csv) are shared by the languages,
+    the counts of the test words are written to freq_path/prompt_type/model/<lang>/.
+    """
+    suffix = TABLE_SUFFIXES[table_format]
+    score_dir = freq_path / prompt_type / gen_file.stem.split("_")[1]
+    return Stage(
+        name=f"adjust_count:{lang}_{gen_file.stem}",
+        command="lm_benchmark.adjust_count",
+        args={
+            "gen_file": gen_file,
+            "est_file": est_file,
+            "CDI_path": cdi_dir,
+            "freq_path": freq_path,
+            "prompt_type": prompt_type,
+            "lang": lang,
+            "set": test_set,
+            "header_lst": header_lst,
+            "count": count,
+            "table_format": table_format,
+        },
+        inputs=[gen_file, est_file, cdi_dir / f"{lang}_exp_{test_set}{suffix}"],
+        outputs=[score_dir / lang, *(score_dir / f"{header}{suffix}" for header in header_lst)],
+    )
+
+
+def score_counts(count_dir: Path, target_file: Path, threshold: float = 1) -> Stage:
+    """Score the test counts of a directory against a count threshold."""
+    return Stage(
+        name=f"score_counts:{target_file.stem}",
+        command="lm_benchmark.score_counts",
+        args={"count_dir": count_dir, "target_file": target_file, "threshold": threshold},
+        inputs=[count_dir],
+        outputs=[target_file],
+    )
+
+
+def build_nonparametric(
+    src_file: Path,
+    target_file: Path,
+    alpha: int = 80000,
+    desired_oov: float = 0.023,
+    *,
+    fixed_alpha: bool = True,
+) -> Stage:
+    """Build the non-parametric (CRP) generation of a frequency file."""
+    return Stage(
+        name=f"build_nonparametric:{target_file.stem}",
+        command="lm_benchmark.build_nonparametric",
+        args={
+            "src_file": src_file,
+            "target_file": target_file,
+            "fixed_alpha": fixed_alpha,
+            "alpha": alpha,
+            "desired_oov": desired_oov,
+        },
+        inputs=[src_file],
+        outputs=[target_file],
+    )
+
+
+def cf_analysis(
+    input_dir: Path,
+    cdi_dir: Path,
+    output_file: Path,
+    gen_dir: Path,
+    prop_lst: tuple[float, ...] = (0.5, 1),
+    *,
+    run_stat: bool = False,
+) -> Stage:
+    """Catastrophic forgetting analysis.
+
+    The selected probe sets are written to their own sub-directory of cdi_dir (cdi_dir/probe_<output stem>),
+    so that the directory can be cleared & restored without touching the other CDI files.
+    """
+    probe_dir = cdi_dir / f"probe_{output_file.stem}"
+    return Stage(
+        name=f"cf_analysis:{output_file.stem}",
+        command="lm_benchmark.cf_analysis",
+        args={
+            "input_dir": input_dir,
+            "CDI_dir": probe_dir,
+            "output_dir": output_file,
+            "gen_dir": gen_dir,
+            "prop_lst": list(prop_lst),
+            "run_stat": run_stat,
+        },
+        inputs=[input_dir, gen_dir],
+        outputs=[output_file, probe_dir],
+    )
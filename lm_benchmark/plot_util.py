@@ -7,6 +7,7 @@ import pandas as pd
 from scipy import optimize as scipy_opt  # type:ignore[import-untyped]
 
 from lm_benchmark import nlp_tools, settings
+from lm_benchmark.storage import read_table
 
 RANDOM_SEED = np.random.default_rng()
 # Revised color dictionary
@@ -38,9 +39,11 @@ color_dict = {
 
 
 def load_csv(file_path: Path, left_header: str, right_header: str) -> pd.DataFrame:
-    """Read the CSV file and load as DataFrame."""
-    df = pd.read_csv(file_path)
+    """Read the table (CSV/Parquet/Feather) and load as DataFrame."""
+    df = read_table(file_path)
     df = df.set_index("word")
+    # Month headers are strings in CSV files & integers in typed files
+    df.columns = df.columns.astype(str)
     # Get the index of the start column
     df = df.loc[:, f"{left_header}" : f"{right_header}"]  # type: ignore[misc] # Ingores slice type
     # Convert column headers to integers
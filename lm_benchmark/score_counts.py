@@ -0,0 +1,49 @@
+"""Score accumulated monthly counts: proportion of test words produced above a count threshold."""
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from lm_benchmark import settings
+from lm_benchmark.storage import FORMATS, write_table
+
+from .analysis.score_util import load_csv
+
+
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Build & Parse command-line arguments."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--count_dir",
+        default=f"{settings.PATH.DATA_DIR}/datasets/processed/month_count/unprompted/LSTM/AE",
+        help="Directory of the test counts (one file per header, as written by adjust-count)",
+    )
+    parser.add_argument("--target_file", default=f"{settings.PATH.DATA_DIR}/datasets/processed/score/AE_LSTM.csv")
+    parser.add_argument("--threshold", type=float, default=1)
+    return parser.parse_args(argv)
+
+
+def score_counts(count_file: Path, threshold: float) -> pd.Series:
+    """Proportion of words whose accumulated count is above the threshold, for each month."""
+    df = load_csv(count_file, "word").set_index("word")
+    return (df > threshold).mean()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Score all count files of a directory and write results to a file."""
+    args = arguments(argv)
+    count_dir = Path(args.count_dir)
+    count_files = sorted(f for f in count_dir.iterdir() if f.suffix in FORMATS)
+    if not count_files:
+        raise ValueError(f"Given directory ::{count_dir}:: contains no count file !!")
+
+    scores = pd.DataFrame({file.stem: score_counts(file, args.threshold) for file in count_files}).T
+    scores.index.name = "header"
+    Path(args.target_file).parent.mkdir(exist_ok=True, parents=True)
+    write_table(scores, args.target_file, index=True)
+    print(f"Writing scores to {args.target_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ from pathlib import Path
 KAIKI_ENGLISH_WORD_DICT_URL = "https://kaikki.org/dictionary/raw-wiktextract-data.jsonl.gz"
 # Dictionairy containing age filters
 AGE_DICT = {"AE": [8, 18], "BE": [12, 25]}
+# CDI forms (expressive & receptive vocabulary)
+CDI_TEST_TYPES = ("exp", "recep")
 # Placeholder string for empty rows
 PLACEHOLDER_MONTH = "placeholder"
 # Model list
@@ -65,6 +67,10 @@ class _MyPathSettings:
     def transcript_path(self) -> Path:
         return self.DATA_DIR / "datasets/sources/CHILDES/transcript"
 
+    @property
+    def childes_catalog_path(self) -> Path:
+        return self.DATA_DIR / "datasets/sources/CHILDES/catalog.sqlite"
+
     @property
     def metadata_path(self) -> Path:
         return self.DATA_DIR / "datasets/raw"
@@ -0,0 +1,148 @@
+"""Storage of the benchmark tables (frequencies, CDI, month counts, generations).
+
+The format is chosen from the file suffix:
+
+- .csv: plain text, kept for exports & compatibility
+- .parquet: compressed & typed columns (requires pyarrow)
+- .feather / .arrow: uncompressed typed columns, fastest to load (requires pyarrow)
+
+Column names that are integers (ex: months) are restored as integers when reading Parquet/Feather files.
+"""
+
+import argparse
+import json
+import typing as t
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa  # type:ignore[import-untyped]
+    from pyarrow import feather, parquet  # type:ignore[import-untyped]
+except ImportError:
+    pa = None
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet", ".feather": "feather", ".arrow": "feather"}
+# Suffix of the files written in each format (for CLIs building file names)
+TABLE_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# Schema metadata listing the column names that were integers
+INT_COLUMNS_KEY = b"lm_benchmark.int_columns"
+# Number of rows per chunk when streaming tables
+CHUNK_SIZE = 100_000
+
+
+def table_format(file: Path | str) -> str:
+    """Storage format of a file, from its suffix.
+
+    Raises
+    ------
+        ValueError if the suffix is not a supported format
+
+    """
+    suffix = Path(file).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported table format ::{suffix}::, expected one of {', '.join(FORMATS)}")
+    return FORMATS[suffix]
+
+
+def _require_arrow(fmt: str) -> None:
+    if pa is None:
+        raise ImportError(f"Reading/Writing {fmt} files requires pyarrow, install it with: pip install pyarrow")
+
+
+def read_table(
+    file: Path | str,
+    columns: t.Sequence[str | int] | None = None,
+    **kwargs: t.Any,  # noqa: ANN401 (forwarded to pd.read_csv)
+) -> pd.DataFrame:
+    """Load a table, only the given columns are read if specified.
+
+    Extra keyword arguments are passed to `pd.read_csv` for CSV files.
+    """
+    fmt = table_format(file)
+    if fmt == "csv":
+        usecols = None if columns is None else [str(c) for c in columns]
+        return pd.read_csv(file, usecols=usecols, **kwargs)
+
+    _require_arrow(fmt)
+    names = None if columns is None else [str(c) for c in columns]
+    reader = parquet.read_table if fmt == "parquet" else feather.read_table
+    table = reader(file, columns=names)
+
+    df = table.to_pandas()
+    int_columns = set(json.loads((table.schema.metadata or {}).get(INT_COLUMNS_KEY, b"[]")))
+    if int_columns:
+        df.columns = pd.Index([int(c) if c in int_columns else c for c in df.columns])
+    return df
+
+
+def iter_table_chunks(
+    file: Path | str,
+    columns: t.Sequence[str],
+    dtype: dict[str, t.Any] | None = None,
+    chunksize: int = CHUNK_SIZE,
+) -> t.Iterator[pd.DataFrame]:
+    """Stream the given columns of a table in chunks of rows, other columns are never loaded.
+
+    `dtype` gives the type of columns (ex: str for text columns), skipping type inference on CSV files.
+    """
+    fmt = table_format(file)
+    if fmt == "csv":
+        with pd.read_csv(file, usecols=list(columns), dtype=dtype, chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    _require_arrow(fmt)
+    if fmt == "parquet":
+        batches = parquet.ParquetFile(file).iter_batches(batch_size=chunksize, columns=list(columns))
+        for batch in batches:
+            yield batch.to_pandas()
+    else:
+        # Feather files are memory-mapped, the projected columns are read at once
+        yield read_table(file, columns=columns)
+
+
+def write_table(df: pd.DataFrame, file: Path | str, *, index: bool = False) -> None:
+    """Write a table, the index is stored only if asked (as with `DataFrame.to_csv`)."""
+    fmt = table_format(file)
+    if fmt == "csv":
+        df.to_csv(file, index=index)
+        return
+
+    _require_arrow(fmt)
+    # Arrow only supports string column names, integer ones are recorded to be restored when reading
+    int_columns = [str(c) for c in df.columns if isinstance(c, int | np.integer)]
+    df = df.rename(columns=str)
+    if fmt == "feather" and index:
+        # Feather files can not store an index
+        df = df.reset_index()
+    table = pa.Table.from_pandas(df, preserve_index=index and fmt == "parquet")
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), INT_COLUMNS_KEY: json.dumps(int_columns).encode()}
+    )
+
+    if fmt == "parquet":
+        parquet.write_table(table, file)
+    else:
+        feather.write_feather(table, file)
+
+
+def arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Build & Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Convert a table between CSV, Parquet & Feather formats")
+    parser.add_argument("src_file", type=str)
+    parser.add_argument("target_file", type=str)
+    parser.add_argument("--columns", nargs="+", default=None, help="Only convert the given columns")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Convert a table (the format is given by the file suffixes)."""
+    args = arguments(argv)
+    write_table(read_table(args.src_file, columns=args.columns), args.target_file)
+    print(f"Converted {args.src_file} to {args.target_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 """Common util func for all the packages."""
 
+import argparse
+import hashlib
 from pathlib import Path
 
 import requests
@@ -19,3 +21,26 @@ def download_file(url: str, target: Path) -> None:
         with target.open("wb") as f:
             for chunk in r.iter_content(chunk_size=8192):
                 f.write(chunk)
+
+
+def str2bool(value: str | bool) -> bool:
+    """Parse a boolean command-line argument (true/false, yes/no, 1/0).
+
+    Raises
+    ------
+        argparse.ArgumentTypeError if the value is not a boolean
+
+    """
+    if isinstance(value, bool):
+        return value
+    if value.lower() in ("true", "yes", "y", "1"):
+        return True
+    if value.lower() in ("false", "no", "n", "0"):
+        return False
+    raise argparse.ArgumentTypeError(f"Boolean value expected, got '{value}'")
+
+
+def file_digest(file: Path, algorithm: str = "sha256") -> str:
+    """Hex digest of the content of a file."""
+    with file.open("rb") as fh:
+        return hashlib.file_digest(fh, algorithm).hexdigest()
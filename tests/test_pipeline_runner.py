@@ -0,0 +1,44 @@
+"""Scheduling of the benchmark stages (failures, skips & dependency cycles)."""
+
+from pathlib import Path
+
+import pytest
+
+from lm_benchmark.pipeline.artifacts import ArtifactStore
+from lm_benchmark.pipeline.runner import run_pipeline
+from lm_benchmark.pipeline.stage import Stage
+
+# Command that can not be imported, so its stage fails
+MISSING_COMMAND = "lm_benchmark.pipeline.missing_command"
+
+
+def make_stage(name: str, tmp_path: Path, inputs: list[str], outputs: list[str]) -> Stage:
+    """Stage failing when run, linked to the others by its inputs & outputs."""
+    return Stage(
+        name=name,
+        command=MISSING_COMMAND,
+        args={},
+        inputs=[tmp_path / f for f in inputs],
+        outputs=[tmp_path / f for f in outputs],
+    )
+
+
+def test_failure_skips_dependents_declared_before(tmp_path: Path) -> None:
+    """Dependents declared before the failing stage are skipped, the status of every stage is returned."""
+    pipeline = [
+        make_stage("c", tmp_path, ["b.csv"], ["c.csv"]),
+        make_stage("b", tmp_path, ["a.csv"], ["b.csv"]),
+        make_stage("a", tmp_path, [], ["a.csv"]),
+    ]
+    status = run_pipeline(pipeline, ArtifactStore(tmp_path / "store"), n_jobs=1)
+    assert status == {"a": "failed", "b": "skipped", "c": "skipped"}
+
+
+def test_circular_dependencies(tmp_path: Path) -> None:
+    """Stages depending on each other are reported."""
+    pipeline = [
+        make_stage("a", tmp_path, ["b.csv"], ["a.csv"]),
+        make_stage("b", tmp_path, ["a.csv"], ["b.csv"]),
+    ]
+    with pytest.raises(ValueError, match="Circular dependencies between stages: a, b"):
+        run_pipeline(pipeline, ArtifactStore(tmp_path / "store"), n_jobs=1)